@@ -4,22 +4,24 @@ Cross-Platform Action Agent CLI
 Main entry point for the automation system
 """
 
+import importlib
 import os
 import sys
-import asyncio
-from typing import Optional
-from dotenv import load_dotenv
+import time
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
 import typer
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.table import Table
+from rich.text import Text
 
-from src.core.agent import GenericUIAgent
-from src.core.config import Config
 from src.utils.logger import setup_logger
+from src.utils.env import load_env, env_snapshot
 
-# Load environment variables
-load_dotenv()
+# Heavy modules (Playwright, OpenAI) are imported by the commands that need them
+if TYPE_CHECKING:
+    from src.core.config import Config
 
 # Initialize CLI app
 app = typer.Typer(
@@ -31,6 +33,8 @@ app = typer.Typer(
 console = Console()
 logger = setup_logger()
 
+REQUIRED_ENV_VARS = frozenset({"OPENAI_API_KEY"})
+
 @app.command()
 def main(
     instruction: str = typer.Argument(..., help="Natural language instruction to execute"),
@@ -49,12 +53,17 @@ def main(
         action-agent "send email to joe@example.com saying 'Meeting at 2pm'" --provider outlook --no-headless
     """
     
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.core.config import Config
+    from src.utils import event_loop
+    
     # Validate environment
+    load_env()
     if not validate_environment():
         sys.exit(1)
     
     # Configure settings
-    config = Config(
+    config = Config.from_env(
         headless=headless,
         timeout=timeout,
         retry_attempts=retries,
@@ -83,7 +92,7 @@ def main(
             task = progress.add_task("Processing instruction...", total=None)
             
             # Run the agent
-            result = asyncio.run(run_agent(instruction, config))
+            result = event_loop.run(run_agent(instruction, config))
             
             progress.update(task, description="✅ Task completed successfully!")
         
@@ -99,19 +108,69 @@ def main(
             logger.exception("Agent execution failed")
         sys.exit(1)
 
-async def run_agent(instruction: str, config: Config):
+async def run_agent(instruction: str, config: "Config"):
     """Run the agent with the given instruction and configuration."""
+    from src.core.agent import GenericUIAgent
+    from src.automation.browser_manager import shutdown_browser_pools
+    
     agent = GenericUIAgent(config)
-    return await agent.execute(instruction)
+    try:
+        return await agent.execute(instruction)
+    finally:
+        await shutdown_browser_pools()
+
+@app.command()
+def batch(
+    instructions_file: Path = typer.Argument(..., exists=True, dir_okay=False, help="File with one instruction per line"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="Browser sessions per provider"),
+    headless: bool = typer.Option(True, "--headless/--no-headless", help="Run browser in headless mode"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose logging")
+):
+    """
+    Execute every instruction in a file as one batch.
+    
+    Example:
+        action-agent batch instructions.txt --concurrency 2
+    """
+    from src.core.config import Config
+    from src.utils import event_loop
+    
+    load_env()
+    if not validate_environment():
+        sys.exit(1)
+    
+    instructions = [line.strip() for line in instructions_file.read_text().splitlines() if line.strip()]
+    config = Config.from_env(headless=headless, verbose=verbose)
+    
+    try:
+        with console.status(f"Processing {len(instructions)} instructions..."):
+            results = event_loop.run(run_agent_batch(instructions, config, concurrency))
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Operation cancelled by user[/yellow]")
+        sys.exit(1)
+    
+    for instruction, result in zip(instructions, results):
+        status = "[green]✅[/green]" if result.get("success") else f"[red]❌ {result.get('error', 'Unknown error')}[/red]"
+        console.print(f"{status} [dim]{instruction}[/dim]")
+    
+    if not all(result.get("success") for result in results):
+        sys.exit(1)
+
+async def run_agent_batch(instructions: list[str], config: "Config", concurrency: int):
+    """Run the agent on a batch of instructions."""
+    from src.core.agent import GenericUIAgent
+    from src.automation.browser_manager import shutdown_browser_pools
+    
+    agent = GenericUIAgent(config)
+    try:
+        return await agent.execute_many(instructions, concurrency)
+    finally:
+        await shutdown_browser_pools()
 
 def validate_environment() -> bool:
     """Validate that required environment variables are set."""
-    required_vars = ["OPENAI_API_KEY"]
-    missing_vars = []
-    
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
+    env = env_snapshot()
+    missing_vars = sorted(var for var in REQUIRED_ENV_VARS if not env.get(var))
     
     if missing_vars:
         console.print(f"[red]Missing required environment variables: {', '.join(missing_vars)}[/red]")
@@ -122,29 +181,35 @@ def validate_environment() -> bool:
 
 def display_results(result: dict):
     """Display the results of the agent execution."""
-    console.print("\n" + "="*60)
-    console.print("[bold green]✅ Task Completed Successfully![/bold green]")
-    console.print("="*60)
-    
-    # Display execution summary
-    console.print(f"[bold]Provider:[/bold] {result.get('provider', 'Unknown')}")
-    console.print(f"[bold]Task:[/bold] {result.get('task_type', 'Unknown')}")
-    console.print(f"[bold]Duration:[/bold] {result.get('duration', 0):.2f} seconds")
+    # Collect everything into one renderable so the report is printed in a single write
+    parts = [
+        Text("\n" + "="*60),
+        Text.from_markup("[bold green]✅ Task Completed Successfully![/bold green]"),
+        Text("="*60),
+        
+        # Execution summary
+        Text.from_markup(f"[bold]Provider:[/bold] {result.get('provider', 'Unknown')}"),
+        Text.from_markup(f"[bold]Task:[/bold] {result.get('task_type', 'Unknown')}"),
+        Text.from_markup(f"[bold]Duration:[/bold] {result.get('duration', 0):.2f} seconds")
+    ]
     
-    # Display action log
+    # Action log
     if result.get('actions'):
-        console.print("\n[bold]Actions Performed:[/bold]")
+        actions = Table.grid(padding=(0, 1))
         for i, action in enumerate(result['actions'], 1):
             status = "✅" if action.get('success', False) else "❌"
-            console.print(f"  {i}. {status} {action.get('description', 'Unknown action')}")
+            actions.add_row(f"  {i}.", status, action.get('description', 'Unknown action'))
+        parts += [Text.from_markup("\n[bold]Actions Performed:[/bold]"), actions]
     
-    # Display any warnings or notes
+    # Any warnings or notes
     if result.get('warnings'):
-        console.print("\n[yellow]Warnings:[/yellow]")
+        warnings = Table.grid(padding=(0, 1))
         for warning in result['warnings']:
-            console.print(f"  ⚠️  {warning}")
+            warnings.add_row("  ⚠️ ", str(warning))
+        parts += [Text.from_markup("\n[yellow]Warnings:[/yellow]"), warnings]
     
-    console.print("\n[dim]Agent execution completed.[/dim]")
+    parts.append(Text.from_markup("\n[dim]Agent execution completed.[/dim]"))
+    console.print(Group(*parts))
 
 @app.command()
 def setup():
@@ -180,24 +245,21 @@ def setup():
         outlook_password = typer.prompt("Outlook password", hide_input=True)
     
     # Write .env file
-    env_content = f"""# Cross-Platform Action Agent Configuration
-OPENAI_API_KEY={openai_key}
-"""
+    lines = [
+        "# Cross-Platform Action Agent Configuration",
+        f"OPENAI_API_KEY={openai_key}"
+    ]
     
     if gmail_email and gmail_password:
-        env_content += f"""
-GMAIL_EMAIL={gmail_email}
-GMAIL_PASSWORD={gmail_password}
-"""
+        lines += ["", f"GMAIL_EMAIL={gmail_email}", f"GMAIL_PASSWORD={gmail_password}"]
     
     if outlook_email and outlook_password:
-        env_content += f"""
-OUTLOOK_EMAIL={outlook_email}
-OUTLOOK_PASSWORD={outlook_password}
-"""
+        lines += ["", f"OUTLOOK_EMAIL={outlook_email}", f"OUTLOOK_PASSWORD={outlook_password}"]
     
-    with open('.env', 'w') as f:
-        f.write(env_content)
+    # Write to a temporary file first so a crash never leaves a half-written .env
+    tmp_file = Path(".env.tmp")
+    tmp_file.write_text("\n".join(lines) + "\n")
+    os.replace(tmp_file, ".env")
     
     console.print("\n[green]✅ Configuration saved to .env file[/green]")
     console.print("[dim]You can now run the agent with: python agent.py 'your instruction'[/dim]")
@@ -214,6 +276,7 @@ def test():
     
     # Test environment
     console.print("\n[bold]1. Environment Test[/bold]")
+    load_env()
     if validate_environment():
         console.print("✅ Environment variables configured")
     else:
@@ -223,9 +286,11 @@ def test():
     # Test imports
     console.print("\n[bold]2. Import Test[/bold]")
     try:
-        from src.core.agent import GenericUIAgent
-        from src.core.config import Config
-        console.print("✅ All modules imported successfully")
+        start = time.perf_counter()
+        importlib.import_module("src.core.agent")
+        config_module = importlib.import_module("src.core.config")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        console.print(f"✅ All modules imported successfully in {elapsed_ms:.1f} ms")
     except ImportError as e:
         console.print(f"❌ Import error: {e}")
         return
@@ -233,7 +298,7 @@ def test():
     # Test configuration
     console.print("\n[bold]3. Configuration Test[/bold]")
     try:
-        config = Config()
+        config = config_module.Config.from_env()
         console.print("✅ Configuration loaded successfully")
     except Exception as e:
         console.print(f"❌ Configuration error: {e}")
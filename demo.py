@@ -5,8 +5,7 @@ Showcases the agent's capabilities with example usage
 """
 
 import asyncio
-import os
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -14,12 +13,17 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from src.core.agent import GenericUIAgent
 from src.core.config import Config
+from src.automation.browser_manager import shutdown_browser_pools
+from src.utils import event_loop
+from src.utils.env import load_env, env_snapshot
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 console = Console()
 
+EXIT_COMMANDS = frozenset({"quit", "exit", "q"})
+
 def print_banner():
     """Print the demo banner."""
     banner = """
@@ -75,25 +79,62 @@ def print_example_instructions():
     
     console.print(examples)
 
-async def run_demo_instruction(agent: GenericUIAgent, instruction: str, description: str):
-    """Run a demo instruction and display results."""
-    console.print(f"\n[bold cyan]Demo: {description}[/bold cyan]")
-    console.print(f"[dim]Instruction: {instruction}[/dim]")
+class AgentPool:
+    """Pool of agents with warm browsers for running demos concurrently."""
+    
+    def __init__(self, config: Config, size: int):
+        self._agents = [GenericUIAgent(config) for _ in range(size)]
+        self._available = asyncio.Queue()
+    
+    async def __aenter__(self):
+        """Start every agent's browser up front."""
+        results = await asyncio.gather(*(agent.start() for agent in self._agents), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # __aexit__ won't run, so close the agents that did start
+            started = [agent for agent, result in zip(self._agents, results) if not isinstance(result, BaseException)]
+            await asyncio.gather(*(agent.close() for agent in started), return_exceptions=True)
+            raise errors[0]
+        
+        for agent in self._agents:
+            self._available.put_nowait(agent)
+        return self
     
-    with Progress(
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close every agent's browser."""
+        await asyncio.gather(*(agent.close() for agent in self._agents))
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow an idle agent for the duration of the block."""
+        agent = await self._available.get()
+        try:
+            yield agent
+        finally:
+            self._available.put_nowait(agent)
+
+def create_progress() -> Progress:
+    """Create the spinner shown while instructions execute."""
+    return Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
         transient=True
-    ) as progress:
-        task = progress.add_task("Executing instruction...", total=None)
-        
+    )
+
+async def run_demo_instruction(agent: GenericUIAgent, instruction: str, description: str, progress: Progress):
+    """Run a demo instruction on a shared spinner and display results."""
+    task = progress.add_task(f"Executing: {description}...", total=None)
+    try:
         # Execute the instruction
         result = await agent.execute(instruction)
-        
-        progress.update(task, description="✅ Demo completed!")
+    finally:
+        progress.remove_task(task)
+    
+    # Display results once execution is done so concurrent demos don't interleave
+    console.print(f"\n[bold cyan]Demo: {description}[/bold cyan]")
+    console.print(f"[dim]Instruction: {instruction}[/dim]")
     
-    # Display results
     if result.get("success"):
         console.print(f"[green]✅ Success![/green] Task completed in {result.get('duration', 0):.2f} seconds")
         console.print(f"[dim]Provider used: {result.get('provider', 'Unknown')}[/dim]")
@@ -103,9 +144,11 @@ async def run_demo_instruction(agent: GenericUIAgent, instruction: str, descript
     # Show action log
     if result.get("actions"):
         console.print("\n[bold]Actions performed:[/bold]")
+        actions = Table.grid(padding=(0, 1))
         for i, action in enumerate(result["actions"][-5:], 1):  # Show last 5 actions
             status = "✅" if action.get("success", False) else "❌"
-            console.print(f"  {i}. {status} {action.get('description', 'Unknown action')}")
+            actions.add_row(f"  {i}.", status, action.get("description", "Unknown action"))
+        console.print(actions)
 
 async def interactive_demo():
     """Run an interactive demo."""
@@ -113,37 +156,39 @@ async def interactive_demo():
     console.print("Enter your own instructions to test the agent!")
     console.print("Type 'quit' to exit the demo.\n")
     
-    # Initialize agent
-    config = Config()
-    agent = GenericUIAgent(config)
+    # Build the spinner once; it is only shown while an instruction runs
+    # so it never redraws over the input prompt
+    progress = create_progress()
     
-    while True:
-        try:
-            instruction = console.input("[bold cyan]Enter instruction: [/bold cyan]")
-            
-            if instruction.lower() in ['quit', 'exit', 'q']:
-                console.print("[yellow]Exiting demo...[/yellow]")
+    # Initialize agent with a browser that stays open between instructions
+    config = Config.from_env()
+    async with GenericUIAgent(config) as agent:
+        while True:
+            try:
+                instruction = console.input("[bold cyan]Enter instruction: [/bold cyan]").strip()
+                
+                if instruction.lower() in EXIT_COMMANDS:
+                    console.print("[yellow]Exiting demo...[/yellow]")
+                    break
+                
+                if not instruction:
+                    continue
+                
+                with progress:
+                    await run_demo_instruction(agent, instruction, "Custom instruction", progress)
+                
+            except KeyboardInterrupt:
+                console.print("\n[yellow]Demo interrupted by user[/yellow]")
                 break
-            
-            if not instruction.strip():
-                continue
-            
-            await run_demo_instruction(agent, instruction, "Custom instruction")
-            
-        except KeyboardInterrupt:
-            console.print("\n[yellow]Demo interrupted by user[/yellow]")
-            break
-        except Exception as e:
-            console.print(f"[red]Error: {str(e)}[/red]")
+            except Exception as e:
+                console.print(f"[red]Error: {str(e)}[/red]")
 
 async def automated_demo():
     """Run an automated demo with predefined examples."""
     console.print("\n[bold yellow]Automated Demo Mode[/bold yellow]")
     console.print("Running predefined examples to showcase the agent...\n")
     
-    # Initialize agent
-    config = Config()
-    agent = GenericUIAgent(config)
+    config = Config.from_env()
     
     # Demo instructions
     demo_instructions = [
@@ -157,17 +202,26 @@ async def automated_demo():
         }
     ]
     
-    for demo in demo_instructions:
-        await run_demo_instruction(agent, demo["instruction"], demo["description"])
-        await asyncio.sleep(2)  # Brief pause between demos
+    async def run_pooled(pool: AgentPool, demo: dict, progress: Progress):
+        async with pool.acquire() as agent:
+            await run_demo_instruction(agent, demo["instruction"], demo["description"], progress)
+    
+    # Run the independent demos concurrently, each on its own warm browser
+    async with AgentPool(config, size=len(demo_instructions)) as pool:
+        with create_progress() as progress:
+            await asyncio.gather(*(run_pooled(pool, demo, progress) for demo in demo_instructions))
 
 def check_environment():
     """Check if the environment is properly configured."""
     console.print("[bold]Environment Check[/bold]")
     
+    env = env_snapshot()
+    
+    def has(*keys: str) -> bool:
+        return all(env.get(key) for key in keys)
+    
     # Check OpenAI API key
-    openai_key = os.getenv("OPENAI_API_KEY")
-    if openai_key:
+    if has("OPENAI_API_KEY"):
         console.print("✅ OpenAI API key configured")
     else:
         console.print("❌ OpenAI API key not found")
@@ -175,22 +229,20 @@ def check_environment():
         return False
     
     # Check email providers
-    gmail_email = os.getenv("GMAIL_EMAIL")
-    gmail_password = os.getenv("GMAIL_PASSWORD")
-    outlook_email = os.getenv("OUTLOOK_EMAIL")
-    outlook_password = os.getenv("OUTLOOK_PASSWORD")
+    gmail_ok = has("GMAIL_EMAIL", "GMAIL_PASSWORD")
+    outlook_ok = has("OUTLOOK_EMAIL", "OUTLOOK_PASSWORD")
     
-    if gmail_email and gmail_password:
+    if gmail_ok:
         console.print("✅ Gmail credentials configured")
     else:
         console.print("⚠️  Gmail credentials not configured")
     
-    if outlook_email and outlook_password:
+    if outlook_ok:
         console.print("✅ Outlook credentials configured")
     else:
         console.print("⚠️  Outlook credentials not configured")
     
-    if not any([gmail_email and gmail_password, outlook_email and outlook_password]):
+    if not (gmail_ok or outlook_ok):
         console.print("[yellow]Warning: No email providers configured. Demo will show interpretation only.[/yellow]")
     
     return True
@@ -214,20 +266,23 @@ async def main():
     
     choice = console.input("\n[bold cyan]Enter choice (1 or 2): [/bold cyan]")
     
-    if choice == "1":
-        await automated_demo()
-    elif choice == "2":
-        await interactive_demo()
-    else:
-        console.print("[yellow]Invalid choice. Running automated demo...[/yellow]")
-        await automated_demo()
+    try:
+        if choice == "1":
+            await automated_demo()
+        elif choice == "2":
+            await interactive_demo()
+        else:
+            console.print("[yellow]Invalid choice. Running automated demo...[/yellow]")
+            await automated_demo()
+    finally:
+        await shutdown_browser_pools()
     
     console.print("\n[green]Demo completed![/green]")
     console.print("[dim]For more information, see the README.md file.[/dim]")
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        event_loop.run(main())
     except KeyboardInterrupt:
         console.print("\n[yellow]Demo interrupted by user[/yellow]")
     except Exception as e:
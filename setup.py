@@ -5,10 +5,14 @@ Setup script for the Cross-Platform Action Agent
 
 import os
 import sys
+import shutil
 import subprocess
 import platform
 from pathlib import Path
 
+REQUIREMENTS_FILE = Path("requirements.txt")
+DEPS_STAMP_FILE = Path(".deps_installed")
+
 def print_banner():
     """Print setup banner."""
     print("=" * 60)
@@ -20,24 +24,40 @@ def check_python_version():
     """Check if Python version is compatible."""
     print("Checking Python version...")
     
-    if sys.version_info < (3, 8):
-        print("❌ Python 3.8 or higher is required")
+    if sys.version_info < (3, 10):
+        print("❌ Python 3.10 or higher is required")
         print(f"Current version: {sys.version}")
         return False
     
     print(f"✅ Python {sys.version.split()[0]} is compatible")
     return True
 
-def install_dependencies():
-    """Install required dependencies."""
+def requirements_up_to_date():
+    """Check if requirements.txt is unchanged since the last install."""
+    if not DEPS_STAMP_FILE.exists():
+        return False
+    return REQUIREMENTS_FILE.stat().st_mtime <= DEPS_STAMP_FILE.stat().st_mtime
+
+def ensure_deps():
+    """Install required dependencies, skipping steps that are already done."""
     print("\nInstalling dependencies...")
     
     try:
-        # Install Python packages
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        print("✅ Python dependencies installed successfully")
+        # Install Python packages, preferring uv's faster resolver
+        if requirements_up_to_date():
+            print("✅ Python dependencies already up to date")
+        else:
+            uv = shutil.which("uv")
+            if uv:
+                command = [uv, "pip", "install", "--python", sys.executable, "-r", str(REQUIREMENTS_FILE)]
+            else:
+                command = [sys.executable, "-m", "pip", "install", "-r", str(REQUIREMENTS_FILE)]
+            
+            subprocess.check_call(command)
+            DEPS_STAMP_FILE.touch()
+            print("✅ Python dependencies installed successfully")
         
-        # Install Playwright browsers
+        # Install Playwright browsers (a no-op when the pinned Chromium build is present)
         print("Installing Playwright browsers...")
         subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
         print("✅ Playwright browsers installed successfully")
@@ -52,11 +72,12 @@ def create_directories():
     """Create necessary directories."""
     print("\nCreating directories...")
     
-    directories = ["logs", "screenshots"]
+    directories = ("logs", "screenshots")
     
     for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
-        print(f"✅ Created directory: {directory}")
+        os.makedirs(directory, exist_ok=True)
+    
+    print(f"✅ Created directories: {', '.join(directories)}")
 
 def setup_environment():
     """Set up environment configuration."""
@@ -77,16 +98,47 @@ def setup_environment():
         return False
     
     # Copy example file
-    with open(example_file, 'r') as f:
-        content = f.read()
-    
-    with open(env_file, 'w') as f:
-        f.write(content)
+    shutil.copyfile(example_file, env_file)
     
     print("✅ Created .env file from template")
     print("⚠️  Please edit .env file with your actual credentials")
     return True
 
+def get_total_memory():
+    """Get total physical memory in bytes, or None if it can't be determined."""
+    # Linux and macOS expose this through sysconf without extra dependencies
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, AttributeError, OSError):
+        pass
+    
+    if sys.platform == "win32":
+        import ctypes
+        
+        class MemoryStatusEx(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong)
+            ]
+        
+        status = MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(MemoryStatusEx)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        return None
+
 def check_system_requirements():
     """Check system requirements."""
     print("\nChecking system requirements...")
@@ -96,15 +148,15 @@ def check_system_requirements():
     print(f"✅ Operating system: {system}")
     
     # Check available memory (rough estimate)
-    try:
-        import psutil
-        memory_gb = psutil.virtual_memory().total / (1024**3)
+    total_memory = get_total_memory()
+    if total_memory is None:
+        print("⚠️  Could not check memory")
+    else:
+        memory_gb = total_memory / (1024**3)
         print(f"✅ Available memory: {memory_gb:.1f} GB")
         
         if memory_gb < 2:
             print("⚠️  Warning: Less than 2GB RAM available")
-    except ImportError:
-        print("⚠️  Could not check memory (psutil not installed)")
     
     return True
 
@@ -121,7 +173,7 @@ def run_tests():
         print("✅ All modules imported successfully")
         
         # Test configuration
-        config = src.core.config.Config()
+        config = src.core.config.Config.from_env()
         print("✅ Configuration loaded successfully")
         
         return True
@@ -168,7 +220,7 @@ def main():
         sys.exit(1)
     
     # Install dependencies
-    if not install_dependencies():
+    if not ensure_deps():
         print("\n❌ Setup failed during dependency installation")
         sys.exit(1)
     
@@ -4,25 +4,241 @@ Browser Manager for Playwright automation
 
 import asyncio
 import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from typing import Optional, Dict, Any, List, Tuple, Union, Callable, Awaitable, TYPE_CHECKING
 from src.core.config import Config
 from src.utils.logger import get_logger, ActionLogger
 
+# Playwright is imported when the first browser starts
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Locator, Page
+
 logger = get_logger(__name__)
 
+# Browsers are closed and relaunched after this many contexts to bound native memory
+BROWSER_POOL_RECYCLE_AFTER = 100
+
+BROWSER_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+
+# Returns the page body without scripts, styles and other markup the DOM
+# analysis never needs, with whitespace between tags removed
+STRIPPED_BODY_SCRIPT = """() => {
+    const clone = document.body.cloneNode(true);
+    clone.querySelectorAll('script, style, svg, noscript, link, meta').forEach(n => n.remove());
+    return clone.outerHTML.replace(/>\\s+</g, '><');
+}"""
+
+# Seconds a prefetched page stays fresh enough to hand to navigate()
+PREFETCH_TTL = 10
+
+# Selector keys login_to_service needs, in the order they are used
+LOGIN_SELECTOR_KEYS = ("email_field", "password_field", "submit_button")
+
+# Read-only action types that can be checked concurrently on the same page
+CONCURRENT_ACTIONS = frozenset({"wait", "verify"})
+
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1280, 'height': 720},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+class BrowserPool:
+    """Pool of launched Chromium browsers shared by BrowserManager sessions."""
+    
+    def __init__(self, headless: bool, size: int):
+        self.headless = headless
+        self.size = max(1, size)
+        self.playwright = None
+        self._loop = None
+        self._start_lock = None
+        self._start_lock_loop = None
+        self._available = None
+        self._launched = 0
+        self._context_counts: Dict["Browser", int] = {}
+        self._persistent_contexts: Dict[str, "BrowserContext"] = {}
+    
+    async def _ensure_started(self):
+        """Start Playwright for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        
+        # Callers that arrive while Playwright is starting wait for that start
+        if self._start_lock_loop is not loop:
+            self._start_lock = asyncio.Lock()
+            self._start_lock_loop = loop
+        
+        async with self._start_lock:
+            if self._loop is loop:
+                return
+            
+            # Objects from a previous (closed) event loop can't be reused
+            if self.playwright is not None:
+                try:
+                    await self.playwright.stop()
+                except Exception as e:
+                    logger.warning(f"Failed to stop previous Playwright driver: {e}")
+                self.playwright = None
+            
+            self._available = asyncio.Queue()
+            self._launched = 0
+            self._context_counts.clear()
+            self._persistent_contexts.clear()
+            from playwright.async_api import async_playwright
+            self.playwright = await async_playwright().start()
+            
+            # Only publish the loop once Playwright is usable on it
+            self._loop = loop
+    
+    async def _launch(self) -> "Browser":
+        """Launch a new browser for the pool."""
+        self._launched += 1
+        try:
+            browser = await self.playwright.chromium.launch(
+                headless=self.headless,
+                args=BROWSER_LAUNCH_ARGS
+            )
+        except Exception:
+            self._launched -= 1
+            raise
+        
+        self._context_counts[browser] = 0
+        return browser
+    
+    async def acquire(self) -> "Browser":
+        """Get an idle browser, launching one if the pool isn't full yet."""
+        await self._ensure_started()
+        
+        while True:
+            if self._available.empty() and self._launched < self.size:
+                return await self._launch()
+            
+            browser = await self._available.get()
+            if browser.is_connected():
+                return browser
+            
+            # Browser crashed while idle; forget it and try again
+            self._context_counts.pop(browser, None)
+            self._launched -= 1
+    
+    async def release(self, browser: "Browser"):
+        """Return a browser to the pool, recycling it once it has served enough contexts."""
+        self._context_counts[browser] = self._context_counts.get(browser, 0) + 1
+        
+        if browser.is_connected() and self._context_counts[browser] < BROWSER_POOL_RECYCLE_AFTER:
+            self._available.put_nowait(browser)
+            return
+        
+        self._context_counts.pop(browser, None)
+        self._launched -= 1
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close recycled browser: {e}")
+    
+    async def persistent_context(self, user_data_dir: str) -> "BrowserContext":
+        """Get the long-lived context for a user data directory, launching it on first use."""
+        await self._ensure_started()
+        
+        context = self._persistent_contexts.get(user_data_dir)
+        if context is None:
+            context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir,
+                headless=self.headless,
+                args=BROWSER_LAUNCH_ARGS,
+                **CONTEXT_OPTIONS
+            )
+            self._persistent_contexts[user_data_dir] = context
+        
+        return context
+    
+    async def close(self):
+        """Close all idle browsers and stop Playwright."""
+        for context in self._persistent_contexts.values():
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"Failed to close persistent context: {e}")
+        
+        if self._available is not None:
+            while not self._available.empty():
+                browser = self._available.get_nowait()
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close pooled browser: {e}")
+        
+        if self.playwright:
+            await self.playwright.stop()
+        
+        self.playwright = None
+        self._loop = None
+        self._available = None
+        self._launched = 0
+        self._context_counts.clear()
+        self._persistent_contexts.clear()
+
+def _fallback_targets(action: Dict[str, Any]) -> List[str]:
+    """Get the selectors of an action's fallback actions."""
+    return [fa.get("target") for fa in action.get("fallback_actions", [])]
+
+async def _aiter_actions(actions: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Iterate a ready-made action plan like a streamed one."""
+    for action in actions:
+        yield action
+
+_browser_pools: Dict[bool, BrowserPool] = {}
+
+def get_browser_pool(config: Config) -> BrowserPool:
+    """Get the process-wide browser pool for the configured headless mode."""
+    pool = _browser_pools.get(config.headless)
+    if pool is None:
+        pool = BrowserPool(config.headless, config.browser_pool_size)
+        _browser_pools[config.headless] = pool
+    return pool
+
+async def shutdown_browser_pools():
+    """Close every pooled browser. Call once before the event loop exits."""
+    for pool in _browser_pools.values():
+        await pool.close()
+
 class BrowserManager:
     """Manages browser automation sessions with Playwright."""
     
     def __init__(self, config: Config):
         self.config = config
-        self.playwright = None
+        self.pool = get_browser_pool(config)
         self.browser = None
         self.context = None
         self.page = None
+        self.persistent = False
         self.action_logger = ActionLogger(logger)
         
+        # Winning selector per (page URL, primary selector), tried first next time
+        self._selector_cache: Dict[Tuple[str, str], str] = {}
+        
+        # Locators built for the current page, reused across clicks and fills
+        self._locators: Dict[str, "Locator"] = {}
+        
+        # Action plan handlers by action type; see _run_action
+        self._action_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[bool]]] = {
+            "navigate": lambda a: self.navigate(a.get("target", "")),
+            "click": lambda a: self.click_element(a.get("target", ""), _fallback_targets(a)),
+            "type": lambda a: self.type_text(a.get("target", ""), a.get("value", ""), _fallback_targets(a)),
+            "wait": lambda a: self.wait_for_element(a.get("target", "")),
+            # Simple verification - check if element exists
+            "verify": lambda a: self.wait_for_element(a.get("target", ""), timeout=5),
+        }
+        
+        # Background page loads by URL, with the time each was started
+        self._prefetches: Dict[str, Tuple[asyncio.Task, float]] = {}
+        
         # Create screenshots directory
         self.screenshots_dir = Path("screenshots")
         self.screenshots_dir.mkdir(exist_ok=True)
@@ -36,36 +252,33 @@ class BrowserManager:
         """Async context manager exit."""
         await self.stop()
     
-    async def start(self):
-        """Start the browser session."""
+    async def start(self, provider: Optional[str] = None):
+        """
+        Start the browser session.
+        
+        Args:
+            provider: Provider the session is for; providers with a configured
+                user data directory reuse one persistent, logged-in context
+        """
         try:
             self.action_logger.log_step("Starting browser session")
             
-            self.playwright = await async_playwright().start()
+            user_data_dir = self.config.get_user_data_dir(provider) if provider else None
             
-            # Launch browser
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.config.headless,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-            )
-            
-            # Create context
-            self.context = await self.browser.new_context(
-                viewport={'width': 1280, 'height': 720},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            )
+            if user_data_dir:
+                # Reuse the provider's persistent context (cookies survive between tasks)
+                self.context = await self.pool.persistent_context(user_data_dir)
+                self.persistent = True
+            else:
+                # Borrow an already-running browser from the pool
+                self.browser = await self.pool.acquire()
+                
+                # Create context
+                self.context = await self.browser.new_context(**CONTEXT_OPTIONS)
             
             # Create page
-            self.page = await self.context.new_page()
-            
-            # Set timeouts
-            self.page.set_default_timeout(self.config.timeout * 1000)
-            self.page.set_default_navigation_timeout(self.config.timeout * 1000)
+            self.page = await self._new_page()
+            self._locators.clear()
             
             self.action_logger.log_success("Browser session started successfully")
             
@@ -73,17 +286,44 @@ class BrowserManager:
             self.action_logger.log_error("Failed to start browser session", e)
             raise
     
+    async def _new_page(self) -> "Page":
+        """Open a page in the session's context with the configured timeouts and routing."""
+        page = await self.context.new_page()
+        
+        # Skip assets automation never looks at; routed per page so the
+        # handler doesn't stack up on reused persistent contexts
+        if self.config.block_resources:
+            await page.route("**/*", self._route_blocked_resources)
+        
+        # Set timeouts
+        page.set_default_timeout(self.config.timeout * 1000)
+        page.set_default_navigation_timeout(self.config.timeout * 1000)
+        
+        return page
+    
+    async def _route_blocked_resources(self, route):
+        """Abort requests for resource types listed in config.block_resources."""
+        if route.request.resource_type in self.config.block_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+    
     async def stop(self):
         """Stop the browser session."""
         try:
+            await self._discard_prefetches()
             if self.page:
                 await self.page.close()
-            if self.context:
+            if self.context and not self.persistent:
                 await self.context.close()
             if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
+                await self.pool.release(self.browser)
+            
+            self.page = None
+            self._locators.clear()
+            self.context = None
+            self.browser = None
+            self.persistent = False
             
             self.action_logger.log_success("Browser session stopped")
             
@@ -95,7 +335,15 @@ class BrowserManager:
         try:
             self.action_logger.log_step(f"Navigating to {url}")
             
-            await self.page.goto(url, wait_until='networkidle')
+            prefetched = await self._take_prefetched_page(url)
+            if prefetched is not None:
+                # Already loaded in the background; just switch to it
+                await self.page.close()
+                self.page = prefetched
+                self._locators.clear()
+            else:
+                # Don't wait for network idle; callers wait for the elements they need
+                await self.page.goto(url, wait_until=self.config.navigation_wait)
             
             self.action_logger.log_action(f"Navigated to {url}", True)
             return True
@@ -104,24 +352,99 @@ class BrowserManager:
             self.action_logger.log_action(f"Navigate to {url}", False, str(e))
             return False
     
+    def prefetch(self, url: str):
+        """Start loading a URL in a background page so a later navigate() to it is instant."""
+        if url not in self._prefetches:
+            self._prefetches[url] = (asyncio.create_task(self._load_page(url)), time.monotonic())
+    
+    async def _load_page(self, url: str) -> "Page":
+        """Open a new page and navigate it to url."""
+        page = await self._new_page()
+        try:
+            await page.goto(url, wait_until=self.config.navigation_wait)
+        except BaseException:
+            await page.close()
+            raise
+        return page
+    
+    async def _take_prefetched_page(self, url: str) -> Optional["Page"]:
+        """Claim the prefetched page for url if it loaded and is still fresh."""
+        entry = self._prefetches.pop(url, None)
+        if entry is None:
+            return None
+        
+        task, started_at = entry
+        if time.monotonic() - started_at > PREFETCH_TTL:
+            await self._discard_prefetch(task)
+            return None
+        
+        try:
+            return await task
+        except Exception as e:
+            logger.warning(f"Prefetch of {url} failed: {e}")
+            return None
+    
+    async def _discard_prefetch(self, task: asyncio.Task):
+        """Cancel a prefetch, closing its page if it already loaded."""
+        task.cancel()
+        try:
+            page = await task
+        except (asyncio.CancelledError, Exception):
+            return
+        await page.close()
+    
+    async def _discard_prefetches(self):
+        """Drop every prefetched page that was never navigated to."""
+        prefetches, self._prefetches = self._prefetches, {}
+        await asyncio.gather(*(self._discard_prefetch(task) for task, _ in prefetches.values()))
+    
+    def clear_selector_cache(self):
+        """Forget which selectors worked, e.g. after a page's markup changes."""
+        self._selector_cache.clear()
+    
+    def _selectors_to_try(self, cache_key: Tuple[str, str], fallback_selectors: List[str] = None) -> List[str]:
+        """Order selectors so the one that last worked on this page comes first."""
+        selectors = [cache_key[1]] + (fallback_selectors or [])
+        
+        cached = self._selector_cache.get(cache_key)
+        if cached in selectors:
+            selectors.remove(cached)
+            selectors.insert(0, cached)
+        
+        return selectors
+    
+    def _forget_selector(self, cache_key: Tuple[str, str], selector: str):
+        """Drop a cached selector that no longer works."""
+        if self._selector_cache.get(cache_key) == selector:
+            del self._selector_cache[cache_key]
+    
+    def _locator(self, selector: str) -> "Locator":
+        """Get the cached locator for a selector on the current page."""
+        locator = self._locators.get(selector)
+        if locator is None:
+            # .first keeps page.click()'s behaviour of acting on the first match
+            locator = self.page.locator(selector).first
+            self._locators[selector] = locator
+        return locator
+    
     async def click_element(self, selector: str, fallback_selectors: List[str] = None) -> bool:
         """Click an element with fallback selectors."""
-        selectors_to_try = [selector] + (fallback_selectors or [])
+        cache_key = (self.page.url, selector)
+        selectors_to_try = self._selectors_to_try(cache_key, fallback_selectors)
         
         for i, sel in enumerate(selectors_to_try):
             try:
                 self.action_logger.log_step(f"Attempting to click element: {sel}")
                 
-                # Wait for element to be visible and clickable
-                await self.page.wait_for_selector(sel, state='visible', timeout=5000)
-                
-                # Click the element
-                await self.page.click(sel)
+                # click() auto-waits for the element to be visible and enabled
+                await self._locator(sel).click(timeout=5000)
                 
+                self._selector_cache[cache_key] = sel
                 self.action_logger.log_action(f"Clicked element: {sel}", True)
                 return True
                 
             except Exception as e:
+                self._forget_selector(cache_key, sel)
                 if i == len(selectors_to_try) - 1:  # Last attempt
                     self.action_logger.log_action(f"Click element: {sel}", False, str(e))
                     return False
@@ -132,22 +455,22 @@ class BrowserManager:
     
     async def type_text(self, selector: str, text: str, fallback_selectors: List[str] = None) -> bool:
         """Type text into an element with fallback selectors."""
-        selectors_to_try = [selector] + (fallback_selectors or [])
+        cache_key = (self.page.url, selector)
+        selectors_to_try = self._selectors_to_try(cache_key, fallback_selectors)
         
         for i, sel in enumerate(selectors_to_try):
             try:
                 self.action_logger.log_step(f"Attempting to type in element: {sel}")
                 
-                # Wait for element to be visible
-                await self.page.wait_for_selector(sel, state='visible', timeout=5000)
-                
-                # Clear existing content and type
-                await self.page.fill(sel, text)
+                # Clear existing content and type; fill() auto-waits for the element
+                await self._locator(sel).fill(text, timeout=5000)
                 
+                self._selector_cache[cache_key] = sel
                 self.action_logger.log_action(f"Typed text in element: {sel}", True)
                 return True
                 
             except Exception as e:
+                self._forget_selector(cache_key, sel)
                 if i == len(selectors_to_try) - 1:  # Last attempt
                     self.action_logger.log_action(f"Type text in element: {sel}", False, str(e))
                     return False
@@ -178,11 +501,20 @@ class BrowserManager:
             logger.error(f"Failed to get page content: {e}")
             return ""
     
+    async def get_stripped_content(self) -> str:
+        """Get the page body's HTML with scripts, styles and similar noise removed."""
+        try:
+            return await self.page.evaluate(STRIPPED_BODY_SCRIPT)
+        except Exception as e:
+            logger.error(f"Failed to get stripped page content: {e}")
+            return ""
+    
     async def take_screenshot(self, filename: str = None) -> Optional[str]:
         """Take a screenshot of the current page."""
         try:
             if filename is None:
-                timestamp = int(time.time())
+                # Nanoseconds so concurrent captures don't overwrite each other
+                timestamp = time.time_ns()
                 filename = f"screenshot_{timestamp}.png"
             
             filepath = self.screenshots_dir / filename
@@ -199,14 +531,14 @@ class BrowserManager:
         """Save the current page's HTML."""
         try:
             if filename is None:
-                timestamp = int(time.time())
+                timestamp = time.time_ns()
                 filename = f"page_{timestamp}.html"
             
             filepath = self.screenshots_dir / filename
             content = await self.page.content()
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write off the event loop; pages can be several MB
+            await asyncio.to_thread(filepath.write_text, content, encoding='utf-8')
             
             self.action_logger.log_action(f"Saved HTML: {filename}", True)
             return str(filepath)
@@ -215,8 +547,50 @@ class BrowserManager:
             self.action_logger.log_action("Save HTML", False, str(e))
             return None
     
-    async def execute_action_plan(self, actions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Execute a list of actions."""
+    async def _run_action(self, action: Dict[str, Any]) -> bool:
+        """Run a single action from an action plan."""
+        handler = self._action_handlers.get(action.get("action", ""))
+        if handler is None:
+            return False
+        return await handler(action)
+    
+    async def _group_actions(self, actions: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Split an action plan into groups that can be dispatched together, as the actions arrive."""
+        pending: List[Dict[str, Any]] = []
+        
+        async for action in actions:
+            if action.get("action", "") in CONCURRENT_ACTIONS:
+                pending.append(action)
+                continue
+            
+            if pending:
+                yield pending
+                pending = []
+            yield [action]
+        
+        if pending:
+            yield pending
+    
+    async def _capture_failure_artifacts(self, step: int) -> List[str]:
+        """Save a screenshot and the page HTML for a failed step, as enabled."""
+        captures = []
+        
+        if self.config.screenshot_on_error:
+            captures.append(self.take_screenshot(f"error_step_{step}.png"))
+        
+        if self.config.save_html_on_error:
+            captures.append(self.save_page_html(f"error_step_{step}.html"))
+        
+        paths = await asyncio.gather(*captures)
+        return [path for path in paths if path]
+    
+    async def execute_action_plan(self, actions: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Execute a list of actions.
+        
+        The plan may also be an async iterable, e.g. one still being streamed
+        from the LLM; each step runs as soon as it has arrived.
+        """
         results = {
             "success": True,
             "actions": [],
@@ -224,71 +598,58 @@ class BrowserManager:
             "screenshots": []
         }
         
-        for action in actions:
-            try:
+        # Failure screenshots/HTML are diagnostic only; capture them in the
+        # background instead of holding up the remaining steps
+        artifact_tasks = []
+        
+        if not isinstance(actions, AsyncIterable):
+            actions = _aiter_actions(actions)
+        
+        # navigate/click/type change page state and run one at a time; runs of
+        # read-only wait/verify checks are dispatched together
+        async for group in self._group_actions(actions):
+            for action in group:
+                self.action_logger.log_step(f"Step {action.get('step', 0)}: {action.get('description', '')}")
+            
+            outcomes = await asyncio.gather(
+                *(self._run_action(action) for action in group),
+                return_exceptions=True
+            )
+            
+            for action, outcome in zip(group, outcomes):
                 step = action.get("step", 0)
-                action_type = action.get("action", "")
-                target = action.get("target", "")
-                value = action.get("value", "")
                 description = action.get("description", "")
-                fallback_actions = action.get("fallback_actions", [])
-                
-                self.action_logger.log_step(f"Step {step}: {description}")
-                
-                success = False
-                
-                if action_type == "navigate":
-                    success = await self.navigate(target)
                 
-                elif action_type == "click":
-                    fallback_selectors = [fa.get("target") for fa in fallback_actions]
-                    success = await self.click_element(target, fallback_selectors)
-                
-                elif action_type == "type":
-                    fallback_selectors = [fa.get("target") for fa in fallback_actions]
-                    success = await self.type_text(target, value, fallback_selectors)
-                
-                elif action_type == "wait":
-                    success = await self.wait_for_element(target)
-                
-                elif action_type == "verify":
-                    # Simple verification - check if element exists
-                    success = await self.wait_for_element(target, timeout=5)
+                if isinstance(outcome, Exception):
+                    results["success"] = False
+                    results["errors"].append(f"Step {step} exception: {str(outcome)}")
+                    self.action_logger.log_error(f"Action execution failed at step {step}", outcome)
+                    continue
                 
                 # Record action result
                 action_result = {
                     "step": step,
-                    "action": action_type,
-                    "target": target,
+                    "action": action.get("action", ""),
+                    "target": action.get("target", ""),
                     "description": description,
-                    "success": success
+                    "success": outcome
                 }
                 
                 results["actions"].append(action_result)
                 
-                if not success:
+                if not outcome:
                     results["success"] = False
                     results["errors"].append(f"Step {step} failed: {description}")
-                    
-                    # Take screenshot on failure if enabled
-                    if self.config.screenshot_on_error:
-                        screenshot_path = await self.take_screenshot(f"error_step_{step}.png")
-                        if screenshot_path:
-                            results["screenshots"].append(screenshot_path)
-                    
-                    # Save HTML on failure if enabled
-                    if self.config.save_html_on_error:
-                        html_path = await self.save_page_html(f"error_step_{step}.html")
-                        if html_path:
-                            results["screenshots"].append(html_path)
-                
-                # Small delay between actions
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                results["success"] = False
-                results["errors"].append(f"Step {step} exception: {str(e)}")
-                self.action_logger.log_error(f"Action execution failed at step {step}", e)
+                    artifact_tasks.append(asyncio.create_task(self._capture_failure_artifacts(step)))
+            
+            # Optional throttle for sites that can't keep up; Playwright
+            # auto-waits for elements otherwise
+            if self.config.inter_action_delay_ms:
+                await asyncio.sleep(self.config.inter_action_delay_ms / 1000)
+        
+        for paths in await asyncio.gather(*artifact_tasks, return_exceptions=True):
+            if isinstance(paths, list):
+                results["screenshots"].extend(paths)
         
         return results
     
@@ -301,10 +662,14 @@ class BrowserManager:
             if not await self.navigate(service_url):
                 return False
             
+            # A persistent session may already be signed in
+            logged_in_selector = selectors.get("logged_in_indicator")
+            if logged_in_selector and await self.page.locator(logged_in_selector).first.is_visible():
+                self.action_logger.log_success("Already logged in, skipping login form")
+                return True
+            
             # Wait for login form
-            email_selector = selectors.get("email_field")
-            password_selector = selectors.get("password_field")
-            submit_selector = selectors.get("submit_button")
+            email_selector, password_selector, submit_selector = (selectors.get(key) for key in LOGIN_SELECTOR_KEYS)
             
             if not all([email_selector, password_selector, submit_selector]):
                 self.action_logger.log_error("Missing required login selectors")
@@ -319,11 +684,16 @@ class BrowserManager:
                 return False
             
             # Submit form
+            login_page_url = self.page.url
             if not await self.click_element(submit_selector):
                 return False
             
-            # Wait for login to complete (look for inbox or compose button)
-            await asyncio.sleep(3)
+            # Wait for login to complete: the signed-in page, or at least a
+            # navigation away from the login form
+            if logged_in_selector:
+                await self.page.wait_for_selector(logged_in_selector, state='visible', timeout=15000)
+            else:
+                await self.page.wait_for_url(lambda url: url != login_page_url, timeout=15000)
             
             self.action_logger.log_success("Login completed successfully")
             return True
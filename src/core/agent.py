@@ -9,21 +9,31 @@ from typing import Dict, List, Any, Optional
 from src.core.config import Config
 from src.services.llm_service import LLMService
 from src.automation.browser_manager import BrowserManager
-from src.providers.gmail_adapter import GmailAdapter
-from src.providers.outlook_adapter import OutlookAdapter
 from src.utils.logger import get_logger, ActionLogger
+from src.utils.llm_cache import DiskCache, make_cache_key
 
 logger = get_logger(__name__)
 
 class GenericUIAgent:
     """Main agent class for cross-platform web automation."""
     
+    # Shared by all agents so concurrent instructions can't exhaust the machine
+    _task_semaphore: Optional[asyncio.Semaphore] = None
+    _task_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+    
     def __init__(self, config: Config):
         self.config = config
         self.llm_service = LLMService(config)
         self.action_logger = ActionLogger(logger)
         self.browser_manager = None
         self.providers = {}
+        self._keep_browser = False
+        
+        # Profile directory of the open browser session (None for a fresh context)
+        self._session_user_data_dir: Optional[str] = None
+        
+        # Interpretation results are kept between runs when caching is switched on
+        self.llm_cache = DiskCache(config.llm_cache_path) if config.llm_cache_enabled else None
         
         # Validate configuration
         try:
@@ -32,6 +42,27 @@ class GenericUIAgent:
             logger.error(f"Configuration validation failed: {e}")
             raise
     
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+    
+    async def start(self):
+        """Keep the browser open between execute() calls until close(), launching it now if possible."""
+        # Providers with a browser profile open their persistent session on first use
+        if not self.browser_manager and self._can_prestart_browser():
+            await self._initialize_browser()
+        self._keep_browser = True
+    
+    async def close(self):
+        """Close the browser launched by start()."""
+        self._keep_browser = False
+        await self._cleanup_browser()
+    
     async def execute(self, instruction: str) -> Dict[str, Any]:
         """
         Execute a natural language instruction.
@@ -42,13 +73,71 @@ class GenericUIAgent:
         Returns:
             Dictionary with execution results
         """
-        start_time = time.time()
+        async with self._get_task_semaphore():
+            return await self._execute(instruction)
+    
+    async def execute_many(self, instructions: List[str], concurrency: int = 4) -> List[Dict[str, Any]]:
+        """
+        Execute several natural language instructions as a batch.
+        
+        Each provider's tasks run from one queue across up to `concurrency`
+        browser sessions of their own.
+        
+        Args:
+            instructions: Natural language instructions to execute
+            concurrency: Maximum number of browser sessions per provider
+            
+        Returns:
+            Dictionary with execution results for each instruction, in order
+        """
+        async with self._get_task_semaphore():
+            start_time = time.monotonic_ns()
+            self.action_logger.log_step(f"Starting batch of {len(instructions)} instructions")
+            
+            task_infos = await self._interpret_instructions(instructions, concurrency)
+            results: List[Optional[Dict[str, Any]]] = [None] * len(instructions)
+            
+            # Group the tasks by provider so each batch shares its adapter's login
+            batches: Dict[str, List[int]] = {}
+            for index, task_info in enumerate(task_infos):
+                if not task_info:
+                    results[index] = self._create_error_result("Failed to interpret instruction")
+                    continue
+                
+                provider = await self._select_provider(task_info)
+                if not provider:
+                    results[index] = self._create_error_result("No suitable provider available")
+                    continue
+                
+                batches.setdefault(provider, []).append(index)
+            
+            async def run_batch(provider: str, indices: List[int]):
+                adapter_class = self._get_provider_class(provider)
+                batch_results = await adapter_class.run_batch(
+                    self.config, [task_infos[index] for index in indices], concurrency
+                )
+                for index, result in zip(indices, batch_results):
+                    result["task_type"] = task_infos[index].get("task_type", "unknown")
+                    results[index] = result
+            
+            await asyncio.gather(*(run_batch(provider, indices) for provider, indices in batches.items()))
+            
+            duration = (time.monotonic_ns() - start_time) / 1e9
+            for result in results:
+                result.setdefault("duration", duration)
+            
+            self.action_logger.log_success(f"Batch completed in {duration:.2f} seconds")
+            return results
+    
+    async def _execute(self, instruction: str) -> Dict[str, Any]:
+        """Execute an instruction once a task slot is free."""
+        start_time = time.monotonic_ns()
         
         try:
             self.action_logger.log_step("Starting instruction execution", instruction)
             
-            # Step 1: Interpret the instruction
-            task_info = await self._interpret_instruction(instruction)
+            # Step 1: Interpret the instruction (launching the browser meanwhile)
+            task_info = await self._interpret_and_start_browser(instruction)
             if not task_info:
                 return self._create_error_result("Failed to interpret instruction")
             
@@ -57,14 +146,14 @@ class GenericUIAgent:
             if not provider:
                 return self._create_error_result("No suitable provider available")
             
-            # Step 3: Initialize browser
-            await self._initialize_browser()
+            # Step 3: Initialize browser (unless a session for the provider is already open)
+            await self._ensure_browser(provider)
             
             # Step 4: Execute the task
             result = await self._execute_task(provider, task_info)
             
             # Step 5: Calculate duration and prepare final result
-            duration = time.time() - start_time
+            duration = (time.monotonic_ns() - start_time) / 1e9
             result["duration"] = duration
             result["task_type"] = task_info.get("task_type", "unknown")
             result["actions"] = self.action_logger.get_actions()
@@ -73,7 +162,7 @@ class GenericUIAgent:
             return result
             
         except Exception as e:
-            duration = time.time() - start_time
+            duration = (time.monotonic_ns() - start_time) / 1e9
             self.action_logger.log_error("Task execution failed", e)
             
             return {
@@ -85,16 +174,28 @@ class GenericUIAgent:
             }
         
         finally:
-            # Clean up browser
-            await self._cleanup_browser()
+            # Clean up browser unless it is kept warm between calls
+            if not self._keep_browser:
+                await self._cleanup_browser()
     
     async def _interpret_instruction(self, instruction: str) -> Optional[Dict[str, Any]]:
         """Interpret the natural language instruction."""
         try:
             self.action_logger.log_step("Interpreting instruction")
             
+            cache_key = None
+            if self.llm_cache is not None:
+                cache_key = self._instruction_cache_key(instruction)
+                task_info = self.llm_cache.get(cache_key)
+                if task_info is not None:
+                    self.action_logger.log_action("Instruction interpreted", True, f"Task type: {task_info.get('task_type')} (cached)")
+                    return task_info
+            
             task_info = await self.llm_service.interpret_instruction(instruction)
             
+            if cache_key is not None:
+                self.llm_cache.set(cache_key, task_info, ttl=self.config.llm_cache_ttl)
+            
             self.action_logger.log_action("Instruction interpreted", True, f"Task type: {task_info.get('task_type')}")
             return task_info
             
@@ -102,6 +203,82 @@ class GenericUIAgent:
             self.action_logger.log_error("Instruction interpretation failed", e)
             return None
     
+    async def _interpret_instructions(self, instructions: List[str], concurrency: int) -> List[Optional[Dict[str, Any]]]:
+        """Interpret a batch of instructions, sending only the uncached ones to the LLM."""
+        try:
+            self.action_logger.log_step(f"Interpreting {len(instructions)} instructions")
+            
+            task_infos: List[Optional[Dict[str, Any]]] = [None] * len(instructions)
+            cache_keys: List[Optional[str]] = [None] * len(instructions)
+            if self.llm_cache is not None:
+                for index, instruction in enumerate(instructions):
+                    cache_keys[index] = self._instruction_cache_key(instruction)
+                    task_infos[index] = self.llm_cache.get(cache_keys[index])
+            
+            pending = [index for index, task_info in enumerate(task_infos) if task_info is None]
+            interpreted = await self.llm_service.interpret_many([instructions[index] for index in pending], concurrency)
+            
+            for index, task_info in zip(pending, interpreted):
+                task_infos[index] = task_info
+                if cache_keys[index] is not None:
+                    self.llm_cache.set(cache_keys[index], task_info, ttl=self.config.llm_cache_ttl)
+            
+            self.action_logger.log_action(
+                "Instructions interpreted", True,
+                f"{len(pending)} interpreted, {len(instructions) - len(pending)} cached"
+            )
+            return task_infos
+            
+        except Exception as e:
+            self.action_logger.log_error("Instruction interpretation failed", e)
+            return [None] * len(instructions)
+    
+    def _instruction_cache_key(self, instruction: str) -> str:
+        """Build the disk cache key for an instruction's interpretation."""
+        return make_cache_key(
+            instruction=instruction,
+            provider=self.config.default_provider,
+            model=self.config.openai_model,
+            temperature=self.config.openai_temperature
+        )
+    
+    def _get_task_semaphore(self) -> asyncio.Semaphore:
+        """Get the process-wide limiter on concurrent execute() calls."""
+        loop = asyncio.get_running_loop()
+        
+        # A semaphore can't be shared across event loops
+        if GenericUIAgent._task_semaphore_loop is not loop:
+            GenericUIAgent._task_semaphore = asyncio.Semaphore(self.config.max_concurrent_tasks)
+            GenericUIAgent._task_semaphore_loop = loop
+        
+        return GenericUIAgent._task_semaphore
+    
+    async def _interpret_and_start_browser(self, instruction: str) -> Optional[Dict[str, Any]]:
+        """Interpret the instruction while the browser launches, when the session doesn't depend on the provider."""
+        browser_task = None
+        if not self.browser_manager and self._can_prestart_browser():
+            browser_task = asyncio.create_task(self._initialize_browser())
+        
+        try:
+            task_info = await self._interpret_instruction(instruction)
+            if browser_task is not None and task_info:
+                await browser_task
+            return task_info
+        finally:
+            # Don't leave a launch running if interpretation failed
+            if browser_task is not None:
+                if not browser_task.done():
+                    browser_task.cancel()
+                await asyncio.gather(browser_task, return_exceptions=True)
+    
+    def _can_prestart_browser(self) -> bool:
+        """Check whether the browser can be started before a provider is selected."""
+        # Providers with a browser profile need their own persistent context
+        return not any(
+            self.config.get_user_data_dir(provider)
+            for provider in self.config.get_available_providers()
+        )
+    
     async def _select_provider(self, task_info: Dict[str, Any]) -> Optional[str]:
         """Select the appropriate provider for the task."""
         try:
@@ -146,13 +323,14 @@ class GenericUIAgent:
             self.action_logger.log_error("Provider selection failed", e)
             return None
     
-    async def _initialize_browser(self):
-        """Initialize the browser manager."""
+    async def _initialize_browser(self, provider_name: Optional[str] = None):
+        """Initialize the browser manager, reusing the provider's persistent session if configured."""
         try:
             self.action_logger.log_step("Initializing browser")
             
             self.browser_manager = BrowserManager(self.config)
-            await self.browser_manager.start()
+            await self.browser_manager.start(provider_name)
+            self._session_user_data_dir = self.config.get_user_data_dir(provider_name) if provider_name else None
             
             self.action_logger.log_action("Browser initialized", True)
             
@@ -160,6 +338,14 @@ class GenericUIAgent:
             self.action_logger.log_error("Browser initialization failed", e)
             raise
     
+    async def _ensure_browser(self, provider_name: str):
+        """Open a browser session for the provider, replacing one that uses another profile."""
+        if self.browser_manager and self._session_user_data_dir != self.config.get_user_data_dir(provider_name):
+            await self._cleanup_browser()
+        
+        if not self.browser_manager:
+            await self._initialize_browser(provider_name)
+    
     async def _execute_task(self, provider_name: str, task_info: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the task using the selected provider."""
         try:
@@ -190,14 +376,11 @@ class GenericUIAgent:
             return self.providers[provider_name]
         
         try:
-            if provider_name == "gmail":
-                adapter = GmailAdapter(self.config, self.browser_manager)
-            elif provider_name == "outlook":
-                adapter = OutlookAdapter(self.config, self.browser_manager)
-            else:
-                self.action_logger.log_error(f"Unknown provider: {provider_name}")
+            adapter_class = self._get_provider_class(provider_name)
+            if adapter_class is None:
                 return None
             
+            adapter = adapter_class(self.config, self.browser_manager)
             self.providers[provider_name] = adapter
             return adapter
             
@@ -205,12 +388,30 @@ class GenericUIAgent:
             self.action_logger.log_error(f"Failed to create {provider_name} adapter", e)
             return None
     
+    def _get_provider_class(self, provider_name: str):
+        """Get the adapter class for a provider."""
+        # Adapters are imported on first use; a run only needs one of them
+        if provider_name == "gmail":
+            from src.providers.gmail_adapter import GmailAdapter
+            return GmailAdapter
+        elif provider_name == "outlook":
+            from src.providers.outlook_adapter import OutlookAdapter
+            return OutlookAdapter
+        
+        self.action_logger.log_error(f"Unknown provider: {provider_name}")
+        return None
+    
     async def _cleanup_browser(self):
         """Clean up browser resources."""
         try:
+            # Adapters hold the browser manager being stopped; drop them so
+            # the next session builds fresh ones
+            self.providers.clear()
+            
             if self.browser_manager:
                 await self.browser_manager.stop()
                 self.browser_manager = None
+                self._session_user_data_dir = None
                 self.action_logger.log_action("Browser cleanup completed", True)
         except Exception as e:
             logger.error(f"Browser cleanup failed: {e}")
@@ -233,8 +434,8 @@ class GenericUIAgent:
         try:
             self.action_logger.log_step("Starting advanced execution with DOM analysis")
             
-            # Interpret instruction
-            task_info = await self._interpret_instruction(instruction)
+            # Interpret instruction (launching the browser meanwhile)
+            task_info = await self._interpret_and_start_browser(instruction)
             if not task_info:
                 return self._create_error_result("Failed to interpret instruction")
             
@@ -243,8 +444,8 @@ class GenericUIAgent:
             if not provider_name:
                 return self._create_error_result("No suitable provider available")
             
-            # Initialize browser
-            await self._initialize_browser()
+            # Initialize browser (unless a session for the provider is already open)
+            await self._ensure_browser(provider_name)
             
             # Get provider adapter
             provider = await self._get_provider_adapter(provider_name)
@@ -256,14 +457,19 @@ class GenericUIAgent:
             if not await self.browser_manager.navigate(service_url):
                 return self._create_error_result("Failed to navigate to service")
             
-            # Get page content for DOM analysis
-            html_content = await self.browser_manager.get_page_content()
+            # Get page content for DOM analysis (scripts and styles only cost tokens)
+            html_content = await self.browser_manager.get_stripped_content()
+            
+            # Load the compose page in the background while the LLM works out the plan
+            compose_url = provider.get_compose_url()
+            if compose_url:
+                self.browser_manager.prefetch(compose_url)
             
             # Analyze DOM structure
             dom_analysis = await self.llm_service.analyze_dom_structure(html_content, task_info)
             
-            # Generate action plan
-            action_plan = await self.llm_service.generate_action_plan(task_info, dom_analysis)
+            # Generate the action plan, executing each step as soon as it arrives
+            action_plan = self.llm_service.stream_action_plan(task_info, dom_analysis)
             
             # Execute action plan
             result = await self.browser_manager.execute_action_plan(action_plan)
@@ -280,7 +486,8 @@ class GenericUIAgent:
             return self._create_error_result(str(e))
         
         finally:
-            await self._cleanup_browser()
+            if not self._keep_browser:
+                await self._cleanup_browser()
     
     def get_supported_tasks(self) -> List[str]:
         """Get list of supported task types."""
@@ -3,69 +3,117 @@ Configuration management for the Cross-Platform Action Agent
 """
 
 import os
-from typing import Optional
-from pydantic import BaseModel, Field
-from dotenv import load_dotenv
+from dataclasses import dataclass, field
+from typing import Any, FrozenSet, Optional, Tuple
+from src.utils.env import load_env
 
 # Load environment variables
-load_dotenv()
+load_env()
 
-class Config(BaseModel):
+# Config fields read from the environment by Config.from_env()
+ENV_FIELDS = {
+    "openai_api_key": "OPENAI_API_KEY",
+    "gmail_email": "GMAIL_EMAIL",
+    "gmail_password": "GMAIL_PASSWORD",
+    "outlook_email": "OUTLOOK_EMAIL",
+    "outlook_password": "OUTLOOK_PASSWORD",
+    "user_data_dir_gmail": "GMAIL_USER_DATA_DIR",
+    "user_data_dir_outlook": "OUTLOOK_USER_DATA_DIR",
+}
+
+@dataclass(frozen=True, slots=True)
+class Config:
     """Configuration settings for the action agent."""
     
     # OpenAI Configuration
-    openai_api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
-    openai_model: str = Field(default="gpt-4", description="OpenAI model to use")
+    openai_api_key: str = ""
+    openai_model: str = "gpt-4"                          # OpenAI model to use
+    openai_temperature: float = 0.1                      # Sampling temperature for LLM calls
     
     # Browser Configuration
-    headless: bool = Field(default=True, description="Run browser in headless mode")
-    timeout: int = Field(default=30, description="Timeout in seconds for operations")
-    retry_attempts: int = Field(default=3, description="Number of retry attempts")
+    headless: bool = True                                # Run browser in headless mode
+    timeout: int = 30                                    # Timeout in seconds for operations
+    retry_attempts: int = 3                              # Number of retry attempts
+    max_backoff: float = 8.0                             # Longest delay between retries in seconds
+    browser_pool_size: int = 2                           # Maximum number of pooled browser processes
+    max_concurrent_tasks: int = 8                        # Maximum number of instructions executed at once
+    navigation_wait: str = "domcontentloaded"            # Load state navigate() waits for
+    
+    # Resource types not loaded by automated pages
+    block_resources: FrozenSet[str] = frozenset({"image", "font", "media"})
     
     # Email Provider Configuration
-    gmail_email: Optional[str] = Field(default_factory=lambda: os.getenv("GMAIL_EMAIL"))
-    gmail_password: Optional[str] = Field(default_factory=lambda: os.getenv("GMAIL_PASSWORD"))
-    outlook_email: Optional[str] = Field(default_factory=lambda: os.getenv("OUTLOOK_EMAIL"))
-    outlook_password: Optional[str] = Field(default_factory=lambda: os.getenv("OUTLOOK_PASSWORD"))
+    gmail_email: Optional[str] = None
+    gmail_password: Optional[str] = None
+    outlook_email: Optional[str] = None
+    outlook_password: Optional[str] = None
+    
+    # Browser profile directories; when set, the provider's login session is kept between tasks
+    user_data_dir_gmail: Optional[str] = None
+    user_data_dir_outlook: Optional[str] = None
     
     # Agent Configuration
-    default_provider: Optional[str] = Field(default=None, description="Default email provider")
-    verbose: bool = Field(default=False, description="Enable verbose logging")
+    default_provider: Optional[str] = None               # Default email provider
+    verbose: bool = False                                # Enable verbose logging
     
     # Advanced Configuration
-    screenshot_on_error: bool = Field(default=True, description="Take screenshot on error")
-    save_html_on_error: bool = Field(default=True, description="Save HTML on error")
-    max_wait_time: int = Field(default=10, description="Maximum wait time for elements")
+    screenshot_on_error: bool = True                     # Take screenshot on error
+    save_html_on_error: bool = True                      # Save HTML on error
+    max_wait_time: int = 10                              # Maximum wait time for elements
+    inter_action_delay_ms: int = 0                       # Delay between action plan steps in milliseconds
+    
+    # LLM Cache Configuration
+    llm_cache_enabled: bool = False                      # Reuse interpretations of repeated instructions
+    llm_cache_path: str = "cache/llm_cache.db"           # Path of the LLM result cache
+    llm_cache_ttl: int = 1800                            # Lifetime of cached LLM results in seconds
+    
+    # Derived from the credentials once; see __post_init__
+    _available_providers: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _configured_providers: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    _validated: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Work out which providers have credentials."""
+        providers = []
+        
+        if self.gmail_email and self.gmail_password:
+            providers.append("gmail")
+        
+        if self.outlook_email and self.outlook_password:
+            providers.append("outlook")
+        
+        # Frozen dataclass; derived fields have to be set through object
+        object.__setattr__(self, "_available_providers", tuple(providers))
+        object.__setattr__(self, "_configured_providers", frozenset(providers))
     
-    class Config:
-        env_prefix = "AGENT_"
-        case_sensitive = False
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "Config":
+        """Create a configuration from the environment, with keyword overrides."""
+        values = {name: os.getenv(var) for name, var in ENV_FIELDS.items()}
+        values["openai_api_key"] = values["openai_api_key"] or ""
+        values["llm_cache_enabled"] = os.getenv("LLM_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+        values.update(overrides)
+        return cls(**values)
     
     def validate(self) -> bool:
         """Validate the configuration."""
+        # Settings can't change after construction, so one successful check is enough
+        if self._validated:
+            return True
+        
         if not self.openai_api_key:
             raise ValueError("OpenAI API key is required")
         
         # Check if at least one email provider is configured
-        gmail_configured = bool(self.gmail_email and self.gmail_password)
-        outlook_configured = bool(self.outlook_email and self.outlook_password)
-        
-        if not gmail_configured and not outlook_configured:
+        if not self._available_providers:
             raise ValueError("At least one email provider must be configured")
         
+        object.__setattr__(self, "_validated", True)
         return True
     
     def get_available_providers(self) -> list[str]:
         """Get list of available email providers."""
-        providers = []
-        
-        if self.gmail_email and self.gmail_password:
-            providers.append("gmail")
-        
-        if self.outlook_email and self.outlook_password:
-            providers.append("outlook")
-        
-        return providers
+        return list(self._available_providers)
     
     def get_provider_credentials(self, provider: str) -> dict:
         """Get credentials for a specific provider."""
@@ -82,6 +130,14 @@ class Config(BaseModel):
         else:
             raise ValueError(f"Unknown provider: {provider}")
     
+    def get_user_data_dir(self, provider: str) -> Optional[str]:
+        """Get the persistent browser profile directory for a provider, if any."""
+        if provider == "gmail":
+            return self.user_data_dir_gmail
+        elif provider == "outlook":
+            return self.user_data_dir_outlook
+        return None
+    
     def is_provider_configured(self, provider: str) -> bool:
         """Check if a provider is configured."""
-        return provider in self.get_available_providers()
+        return provider in self._configured_providers
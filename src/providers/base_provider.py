@@ -4,21 +4,65 @@ Abstract interface for email service providers
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from src.core.config import Config
 from src.automation.browser_manager import BrowserManager
 from src.utils.logger import get_logger
 import asyncio
+import random
 
 logger = get_logger(__name__)
 
+# Sets the value of several form fields in one round-trip. Takes
+# [selector, text] pairs and returns false, without touching anything, if a
+# field is missing or isn't a plain input, textarea or contenteditable.
+FILL_FIELDS_SCRIPT = """(fields) => {
+    const elements = fields.map(([selector]) => document.querySelector(selector));
+    const fillable = el => el && (el.isContentEditable || el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement);
+    if (!elements.every(fillable)) return false;
+    elements.forEach((el, i) => {
+        const text = fields[i][1];
+        if (el.isContentEditable) {
+            el.innerText = text;
+        } else {
+            // Use the native setter so framework-controlled inputs see the change
+            const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, text);
+        }
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+    });
+    return true;
+}"""
+
+# Task fields an email can't be sent without
+_REQUIRED_FIELDS = ("recipients", "content")
+
 class ProviderAdapter(ABC):
     """Abstract base class for email provider adapters."""
     
+    # Set per subclass in __init_subclass__, e.g. "gmail" for GmailAdapter
+    _provider_name: str = ""
+    
+    # Prefixes of every page URL of the service, set per subclass
+    URL_PREFIXES: tuple = ()
+    
+    # Compose form selectors, set per subclass
+    COMPOSE_SELECTORS: Mapping[str, str] = MappingProxyType({})
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._provider_name = cls.__name__.lower().removesuffix("adapter")
+    
     def __init__(self, config: Config, browser_manager: BrowserManager):
         self.config = config
         self.browser_manager = browser_manager
         self.logger = get_logger(f"{__name__}.{self.__class__.__name__}")
+        
+        # Set once login succeeds so later tasks can skip it
+        self._ready = asyncio.Event()
+        self._task_lock = asyncio.Lock()
     
     @abstractmethod
     async def login(self, credentials: Dict[str, str]) -> bool:
@@ -51,18 +95,22 @@ class ProviderAdapter(ABC):
         """Get the service URL for this provider."""
         pass
     
+    def get_compose_url(self) -> Optional[str]:
+        """Get a URL that opens the compose form directly, if the service has one."""
+        return None
+    
     @abstractmethod
-    def get_login_selectors(self) -> Dict[str, str]:
+    def get_login_selectors(self) -> Mapping[str, str]:
         """Get the CSS selectors for login form elements."""
         pass
     
     @abstractmethod
-    def get_compose_selectors(self) -> Dict[str, str]:
+    def get_compose_selectors(self) -> Mapping[str, str]:
         """Get the CSS selectors for compose form elements."""
         pass
     
     @abstractmethod
-    def get_navigation_selectors(self) -> Dict[str, str]:
+    def get_navigation_selectors(self) -> Mapping[str, str]:
         """Get the CSS selectors for navigation elements."""
         pass
     
@@ -76,47 +124,231 @@ class ProviderAdapter(ABC):
         Returns:
             Dictionary with execution results
         """
+        provider_name = self._provider_name
+        
         try:
-            self.logger.info(f"Starting task execution for {self.__class__.__name__}")
+            self.logger.info("Starting task execution for %s", self.__class__.__name__)
             
             # Get credentials
-            provider_name = self.get_provider_name()
             credentials = self.config.get_provider_credentials(provider_name)
             
-            # Login
-            login_success = await self.login(credentials)
-            if not login_success:
-                return {
-                    "success": False,
-                    "error": "Login failed",
-                    "provider": provider_name
-                }
-            
-            # Send email
-            result = await self.send_email(task_info)
+            # Tasks on one adapter share its page, so run them one at a time
+            async with self._task_lock:
+                # Login, unless the session from an earlier task is still signed in
+                if not await self._session_ready():
+                    login_success = await self.login(credentials)
+                    if not login_success:
+                        return {
+                            "success": False,
+                            "error": "Login failed",
+                            "provider": provider_name
+                        }
+                    self._ready.set()
+                
+                # Send email
+                result = await self.send_email(task_info)
+            
             result["provider"] = provider_name
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Task execution failed: {e}")
+            self.logger.error("Task execution failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
-                "provider": self.get_provider_name()
+                "provider": provider_name
             }
     
+    @classmethod
+    async def run_batch(cls, config: Config, task_infos: List[Dict[str, Any]], concurrency: int = 4) -> List[Dict[str, Any]]:
+        """
+        Execute many tasks concurrently from a shared, bounded queue.
+        
+        Each worker runs its own browser session (in the provider's persistent
+        profile, if one is configured) and adapter, so their steps never
+        contend for a page; results are returned in input order.
+        """
+        workers = min(concurrency, len(task_infos))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(task_infos)
+        
+        async def produce():
+            for item in enumerate(task_infos):
+                await queue.put(item)
+            for _ in range(workers):
+                await queue.put(None)
+        
+        async def worker():
+            browser_manager = BrowserManager(config)
+            try:
+                await browser_manager.start(cls._provider_name)
+                adapter = cls(config, browser_manager)
+                while (item := await queue.get()) is not None:
+                    index, task_info = item
+                    results[index] = await adapter.execute_task(task_info)
+            finally:
+                await browser_manager.stop()
+        
+        producer = asyncio.create_task(produce())
+        try:
+            outcomes = await asyncio.gather(*(worker() for _ in range(workers)), return_exceptions=True)
+        finally:
+            # Workers that failed leave the producer blocked on a full queue
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        for error in errors:
+            logger.error("Batch worker failed: %s", error)
+        
+        # Tasks left in the queue when every worker failed never ran
+        error = str(errors[0]) if errors else "Task was not run"
+        return [
+            result if result is not None else {"success": False, "error": error, "provider": cls._provider_name}
+            for result in results
+        ]
+    
+    async def _send_email_impl(self, task_info: Dict[str, Any], *, tab_between_fields: bool = False) -> Dict[str, Any]:
+        """
+        Send an email through the provider's compose form.
+        
+        Args:
+            task_info: Structured task information
+            tab_between_fields: Press Tab to move focus between the form fields
+            
+        Returns:
+            Dictionary with execution results
+        """
+        service = self._provider_name.capitalize()
+        
+        try:
+            self.logger.info("Starting %s email send process", service)
+            
+            # Validate task info
+            if not self._validate_task_info(task_info):
+                return {"success": False, "error": "Invalid task information"}
+            
+            # Prepare the form values and selectors up front so the browser
+            # steps below run back to back
+            compose_selectors = self.get_compose_selectors()
+            to_field = compose_selectors["to_field"]
+            subject_field = compose_selectors["subject_field"]
+            content_field = compose_selectors["content_field"]
+            send_button = compose_selectors["send_button"]
+            compose_area = compose_selectors["compose_area"]
+            
+            recipients = task_info["recipients"]
+            subject = task_info.get("subject", "Message from automation system")
+            content = task_info["content"]
+            
+            # Navigate to the service if not already there
+            current_url = self.browser_manager.page.url
+            if not current_url.startswith(self.URL_PREFIXES):
+                if not await self.browser_manager.navigate(self.get_service_url()):
+                    return {"success": False, "error": f"Failed to navigate to {service}"}
+            
+            # Wait for page to load
+            await self._wait_for_page_load(expected_selector=compose_selectors["compose_button"])
+            
+            # Click compose button; the click waits for whichever alternative in
+            # the selector list shows up, in one round-trip
+            if not await self.browser_manager.click_element(compose_selectors["compose_button"]):
+                return {"success": False, "error": "Failed to click compose button"}
+            
+            # Wait for compose area to load
+            await self._wait_for(compose_area)
+            
+            # Fill recipient field
+            if not await self._fill_recipients(to_field, recipients):
+                return {"success": False, "error": "Failed to fill recipient field"}
+            
+            if tab_between_fields:
+                await self.browser_manager.page.keyboard.press("Tab")
+            
+            # Fill subject and content in one go, typing them if the fields
+            # can't be set directly
+            if not await self._fill_fields({subject_field: subject, content_field: content}):
+                if not await self.browser_manager.type_text(subject_field, subject):
+                    return {"success": False, "error": "Failed to fill subject field"}
+                
+                if tab_between_fields:
+                    await self.browser_manager.page.keyboard.press("Tab")
+                
+                if not await self.browser_manager.type_text(content_field, content):
+                    return {"success": False, "error": "Failed to fill content field"}
+            
+            # Send the email
+            if not await self.browser_manager.click_element(send_button):
+                return {"success": False, "error": "Failed to click send button"}
+            
+            if not await self._confirm_sent():
+                self.logger.error("%s did not confirm the email was sent", service)
+                await self._take_error_screenshot(f"{self._provider_name}_send_unconfirmed")
+                return {"success": False, "error": "Email send was not confirmed"}
+            
+            self.logger.info("%s email sent successfully", service)
+            return {"success": True, "message": "Email sent successfully"}
+            
+        except Exception as e:
+            self.logger.error("%s send email exception: %s", service, e)
+            await self._take_error_screenshot(f"{self._provider_name}_send_failed")
+            return {"success": False, "error": str(e)}
+    
+    async def _confirm_sent(self) -> bool:
+        """Wait for the send to complete; by default, for the compose form to close."""
+        return await self._wait_for(self.get_compose_selectors()["compose_area"], state="hidden")
+    
+    async def _session_ready(self) -> bool:
+        """Check whether the session an earlier task signed into is still usable."""
+        if self._ready.is_set() and await self._is_already_logged_in():
+            return True
+        
+        self._ready.clear()
+        return False
+    
+    async def _is_already_logged_in(self) -> bool:
+        """Check if the page is signed into the service."""
+        return False
+    
     def get_provider_name(self) -> str:
         """Get the provider name."""
-        return self.__class__.__name__.lower().replace("adapter", "")
+        return self._provider_name
     
-    async def _wait_for_page_load(self, timeout: int = 10) -> bool:
-        """Wait for page to load completely."""
+    async def _wait_for_page_load(self, timeout: int = 10, expected_selector: Optional[str] = None) -> bool:
+        """
+        Wait for the page to be ready for the next step.
+        
+        Mail apps keep long-poll connections open, so network idle rarely
+        arrives; wait for the DOM and then only for the element needed next.
+        """
         try:
-            await self.browser_manager.page.wait_for_load_state('networkidle', timeout=timeout * 1000)
+            page = self.browser_manager.page
+            await page.wait_for_load_state('domcontentloaded', timeout=timeout * 1000)
+            if expected_selector:
+                await page.wait_for_selector(expected_selector, state='attached', timeout=timeout * 1000)
             return True
         except Exception as e:
-            self.logger.warning(f"Page load wait failed: {e}")
+            self.logger.warning("Page load wait failed: %s", e)
+            return False
+    
+    async def _wait_for(self, selector: str, timeout: int = 10_000, state: str = "visible") -> bool:
+        """Wait until a selector reaches the given state instead of sleeping a fixed time."""
+        try:
+            await self.browser_manager.page.wait_for_selector(selector, state=state, timeout=timeout)
+            return True
+        except Exception as e:
+            self.logger.warning("Wait for %s (%s) failed: %s", selector, state, e)
+            return False
+    
+    async def _probe_logged_in(self, timeout: int = 1500) -> bool:
+        """Wait briefly for the compose button, returning as soon as it shows up."""
+        try:
+            await self.browser_manager.page.wait_for_selector(
+                self.get_compose_selectors()["compose_button"], state="visible", timeout=timeout
+            )
+            return True
+        except PlaywrightTimeoutError:
             return False
     
     async def _take_error_screenshot(self, step_name: str) -> Optional[str]:
@@ -133,15 +365,9 @@ class ProviderAdapter(ABC):
     
     def _validate_task_info(self, task_info: Dict[str, Any]) -> bool:
         """Validate that task info contains required fields."""
-        required_fields = ["recipients", "content"]
-        
-        for field in required_fields:
-            if not task_info.get(field):
-                self.logger.error(f"Missing required field: {field}")
-                return False
-        
-        if not task_info.get("recipients"):
-            self.logger.error("No recipients specified")
+        missing = next((field for field in _REQUIRED_FIELDS if not task_info.get(field)), None)
+        if missing is not None:
+            self.logger.error("Missing required field: %s", missing)
             return False
         
         return True
@@ -150,21 +376,52 @@ class ProviderAdapter(ABC):
         """Format recipients list for input field."""
         if isinstance(recipients, str):
             return recipients
+        if len(recipients) == 1:
+            return recipients[0]
         return ", ".join(recipients)
     
+    async def _fill_fields(self, values: Dict[str, str]) -> bool:
+        """Fill several fields, keyed by selector, in one script call; False if they can't be set directly."""
+        try:
+            return bool(await self.browser_manager.page.evaluate(FILL_FIELDS_SCRIPT, list(values.items())))
+        except Exception as e:
+            self.logger.warning("Direct form fill failed: %s", e)
+            return False
+    
+    async def _fill_recipients(self, to_field: str, recipients: List[str]) -> bool:
+        """Enter recipients into the To field, committing each address as it's typed."""
+        if isinstance(recipients, str) or len(recipients) <= 1:
+            return await self.browser_manager.type_text(to_field, self._format_recipients(recipients))
+        
+        # Fill the first address, then type the rest after a separator so the
+        # field's autocomplete turns each one into a chip once, rather than
+        # re-parsing one long comma-separated string
+        if not await self.browser_manager.type_text(to_field, recipients[0]):
+            return False
+        
+        keyboard = self.browser_manager.page.keyboard
+        for recipient in recipients[1:]:
+            await keyboard.type(f",{recipient}")
+        
+        return True
+    
     async def _retry_action(self, action_func, max_retries: int = None) -> bool:
-        """Retry an action with exponential backoff."""
+        """Retry an action with capped, jittered exponential backoff."""
         max_retries = max_retries or self.config.retry_attempts
+        loop = asyncio.get_running_loop()
         
         for attempt in range(max_retries):
+            started = loop.time()
             try:
                 result = await action_func()
                 if result:
                     return True
             except Exception as e:
-                self.logger.warning(f"Action attempt {attempt + 1} failed: {e}")
+                self.logger.warning("Action attempt %d failed after %.2fs: %s", attempt + 1, loop.time() - started, e)
             
             if attempt < max_retries - 1:
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                # Jitter keeps concurrent tasks from retrying in lockstep
+                delay = min(2 ** attempt, self.config.max_backoff) + random.uniform(0, 0.5)
+                await asyncio.sleep(delay)
         
         return False
@@ -3,8 +3,8 @@ Gmail Provider Adapter
 Handles Gmail-specific automation
 """
 
-import asyncio
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional
 from src.providers.base_provider import ProviderAdapter
 from src.core.config import Config
 from src.automation.browser_manager import BrowserManager
@@ -15,6 +15,38 @@ logger = get_logger(__name__)
 class GmailAdapter(ProviderAdapter):
     """Gmail-specific provider adapter."""
     
+    # Every page of the service starts with one of these
+    URL_PREFIXES = ("https://mail.google.com/", "https://gmail.com/")
+    
+    # Start of every URL the signed-in mail app is served from
+    LOGGED_IN_URL = "https://mail.google.com/mail/u/"
+    
+    # Selectors are constant; built once and shared read-only by every instance
+    LOGIN_SELECTORS = MappingProxyType({
+        "email_field": "input[type='email'], input[name='identifier']",
+        "password_field": "input[type='password'], input[name='password']",
+        "submit_button": "button[type='submit'], input[type='submit'], #identifierNext, #passwordNext",
+        "next_button": "#identifierNext, #passwordNext",
+        "email_next": "#identifierNext",
+        "password_next": "#passwordNext"
+    })
+    
+    COMPOSE_SELECTORS = MappingProxyType({
+        "to_field": "textarea[name='to'], input[name='to'], .aoD.az6 input",
+        "subject_field": "input[name='subject'], .aoD.az6 input[placeholder*='Subject']",
+        "content_field": "div[contenteditable='true'], .Am.Al.editable, iframe[title*='Message']",
+        "send_button": "div[data-tooltip*='Send'], .T-I.J-J5-Ji.aoO.T-I-atl.L3",
+        "compose_button": "div[data-tooltip*='Compose'], .T-I.T-I-KE.L3",
+        "compose_area": ".AD"
+    })
+    
+    NAVIGATION_SELECTORS = MappingProxyType({
+        "compose_button": "div[data-tooltip*='Compose'], .T-I.T-I-KE.L3, button[aria-label*='Compose']",
+        "inbox_link": "a[href*='#inbox'], .TN.bzz.aHS-bnt",
+        "sent_link": "a[href*='#sent'], .TN.bzz.aHS-bnt",
+        "drafts_link": "a[href*='#draft'], .TN.bzz.aHS-bnt"
+    })
+    
     def __init__(self, config: Config, browser_manager: BrowserManager):
         super().__init__(config, browser_manager)
         self.service_url = "https://gmail.com"
@@ -22,36 +54,20 @@ class GmailAdapter(ProviderAdapter):
     def get_service_url(self) -> str:
         return self.service_url
     
-    def get_login_selectors(self) -> Dict[str, str]:
+    def get_compose_url(self) -> Optional[str]:
+        return "https://mail.google.com/mail/u/0/#inbox?compose=new"
+    
+    def get_login_selectors(self) -> Mapping[str, str]:
         """Get Gmail-specific login selectors."""
-        return {
-            "email_field": "input[type='email'], input[name='identifier']",
-            "password_field": "input[type='password'], input[name='password']",
-            "submit_button": "button[type='submit'], input[type='submit'], #identifierNext, #passwordNext",
-            "next_button": "#identifierNext, #passwordNext",
-            "email_next": "#identifierNext",
-            "password_next": "#passwordNext"
-        }
-    
-    def get_compose_selectors(self) -> Dict[str, str]:
+        return self.LOGIN_SELECTORS
+    
+    def get_compose_selectors(self) -> Mapping[str, str]:
         """Get Gmail-specific compose selectors."""
-        return {
-            "to_field": "textarea[name='to'], input[name='to'], .aoD.az6 input",
-            "subject_field": "input[name='subject'], .aoD.az6 input[placeholder*='Subject']",
-            "content_field": "div[contenteditable='true'], .Am.Al.editable, iframe[title*='Message']",
-            "send_button": "div[data-tooltip*='Send'], .T-I.J-J5-Ji.aoO.T-I-atl.L3",
-            "compose_button": "div[data-tooltip*='Compose'], .T-I.T-I-KE.L3",
-            "compose_area": ".AD"
-        }
-    
-    def get_navigation_selectors(self) -> Dict[str, str]:
+        return self.COMPOSE_SELECTORS
+    
+    def get_navigation_selectors(self) -> Mapping[str, str]:
         """Get Gmail-specific navigation selectors."""
-        return {
-            "compose_button": "div[data-tooltip*='Compose'], .T-I.T-I-KE.L3, button[aria-label*='Compose']",
-            "inbox_link": "a[href*='#inbox'], .TN.bzz.aHS-bnt",
-            "sent_link": "a[href*='#sent'], .TN.bzz.aHS-bnt",
-            "drafts_link": "a[href*='#draft'], .TN.bzz.aHS-bnt"
-        }
+        return self.NAVIGATION_SELECTORS
     
     async def login(self, credentials: Dict[str, str]) -> bool:
         """Login to Gmail."""
@@ -62,8 +78,10 @@ class GmailAdapter(ProviderAdapter):
             if not await self.browser_manager.navigate(self.service_url):
                 return False
             
-            # Wait for page to load
-            await self._wait_for_page_load()
+            # Wait for either the signed-in app or the sign-in form
+            await self._wait_for_page_load(
+                expected_selector=f"{self.COMPOSE_SELECTORS['compose_button']}, {self.LOGIN_SELECTORS['email_field']}"
+            )
             
             # Check if already logged in
             if await self._is_already_logged_in():
@@ -82,75 +100,13 @@ class GmailAdapter(ProviderAdapter):
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Gmail login exception: {e}")
+            self.logger.error("Gmail login exception: %s", e)
             await self._take_error_screenshot("gmail_login_exception")
             return False
     
     async def send_email(self, task_info: Dict[str, Any]) -> Dict[str, Any]:
         """Send email via Gmail."""
-        try:
-            self.logger.info("Starting Gmail email send process")
-            
-            # Validate task info
-            if not self._validate_task_info(task_info):
-                return {"success": False, "error": "Invalid task information"}
-            
-            # Navigate to Gmail if not already there
-            current_url = self.browser_manager.page.url
-            if "gmail.com" not in current_url:
-                if not await self.browser_manager.navigate(self.service_url):
-                    return {"success": False, "error": "Failed to navigate to Gmail"}
-            
-            # Wait for page to load
-            await self._wait_for_page_load()
-            
-            # Click compose button
-            compose_selectors = self.get_compose_selectors()
-            compose_button = compose_selectors["compose_button"]
-            
-            if not await self.browser_manager.click_element(compose_button):
-                return {"success": False, "error": "Failed to click compose button"}
-            
-            # Wait for compose area to load
-            await asyncio.sleep(2)
-            
-            # Fill recipient field
-            to_field = compose_selectors["to_field"]
-            recipients = self._format_recipients(task_info["recipients"])
-            
-            if not await self.browser_manager.type_text(to_field, recipients):
-                return {"success": False, "error": "Failed to fill recipient field"}
-            
-            # Fill subject field
-            subject = task_info.get("subject", "Message from automation system")
-            subject_field = compose_selectors["subject_field"]
-            
-            if not await self.browser_manager.type_text(subject_field, subject):
-                return {"success": False, "error": "Failed to fill subject field"}
-            
-            # Fill content field
-            content = task_info["content"]
-            content_field = compose_selectors["content_field"]
-            
-            if not await self.browser_manager.type_text(content_field, content):
-                return {"success": False, "error": "Failed to fill content field"}
-            
-            # Send the email
-            send_button = compose_selectors["send_button"]
-            
-            if not await self.browser_manager.click_element(send_button):
-                return {"success": False, "error": "Failed to click send button"}
-            
-            # Wait for send to complete
-            await asyncio.sleep(3)
-            
-            self.logger.info("Gmail email sent successfully")
-            return {"success": True, "message": "Email sent successfully"}
-            
-        except Exception as e:
-            self.logger.error(f"Gmail send email exception: {e}")
-            await self._take_error_screenshot("gmail_send_failed")
-            return {"success": False, "error": str(e)}
+        return await self._send_email_impl(task_info, tab_between_fields=False)
     
     async def _handle_gmail_login(self, credentials: Dict[str, str]) -> bool:
         """Handle Gmail's two-step login process."""
@@ -167,11 +123,9 @@ class GmailAdapter(ProviderAdapter):
             if not await self.browser_manager.click_element(email_next):
                 return False
             
-            # Wait for password field to appear
-            await asyncio.sleep(2)
-            
-            # Step 2: Enter password
+            # Step 2: Enter password once the field appears
             password_field = email_selectors["password_field"]
+            await self._wait_for(password_field)
             
             if not await self.browser_manager.type_text(password_field, credentials["password"]):
                 return False
@@ -181,32 +135,30 @@ class GmailAdapter(ProviderAdapter):
             if not await self.browser_manager.click_element(password_next):
                 return False
             
-            # Wait for login to complete
-            await asyncio.sleep(5)
+            # Wait for login to complete (the inbox shows the compose button)
+            await self._wait_for(self.get_compose_selectors()["compose_button"], timeout=15_000)
             
             # Check if login was successful
             return await self._is_already_logged_in()
             
         except Exception as e:
-            self.logger.error(f"Gmail login process failed: {e}")
+            self.logger.error("Gmail login process failed: %s", e)
             return False
     
     async def _is_already_logged_in(self) -> bool:
         """Check if already logged into Gmail."""
         try:
-            # Look for compose button or inbox
-            compose_selectors = self.get_compose_selectors()
-            compose_button = compose_selectors["compose_button"]
-            
-            # Wait a bit for page to load
-            await asyncio.sleep(2)
+            # The login page redirects away from the mail app, so the URL alone
+            # settles it without querying the DOM (a prefix match, since sign-in
+            # pages carry the mail app URL in their query string)
+            if self.browser_manager.page.url.startswith(self.LOGGED_IN_URL):
+                return True
             
-            # Check if compose button is visible
-            element = await self.browser_manager.page.query_selector(compose_button)
-            return element is not None
+            # Otherwise give the compose button a moment to show up
+            return await self._probe_logged_in()
             
         except Exception as e:
-            self.logger.warning(f"Error checking login status: {e}")
+            self.logger.warning("Error checking login status: %s", e)
             return False
     
     async def _wait_for_compose_area(self) -> bool:
@@ -219,5 +171,5 @@ class GmailAdapter(ProviderAdapter):
             return True
             
         except Exception as e:
-            self.logger.warning(f"Compose area wait failed: {e}")
+            self.logger.warning("Compose area wait failed: %s", e)
             return False
@@ -3,8 +3,8 @@ Outlook Provider Adapter
 Handles Outlook-specific automation
 """
 
-import asyncio
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional
 from src.providers.base_provider import ProviderAdapter
 from src.core.config import Config
 from src.automation.browser_manager import BrowserManager
@@ -15,6 +15,37 @@ logger = get_logger(__name__)
 class OutlookAdapter(ProviderAdapter):
     """Outlook-specific provider adapter."""
     
+    # Every page of the service starts with one of these
+    URL_PREFIXES = ("https://outlook.live.com/", "https://outlook.office.com/")
+    
+    # Start of every URL the signed-in mail app is served from
+    LOGGED_IN_URL = "https://outlook.live.com/mail/"
+    
+    # Selectors are constant; built once and shared read-only by every instance
+    LOGIN_SELECTORS = MappingProxyType({
+        "email_field": "input[type='email'], input[name='loginfmt']",
+        "password_field": "input[type='password'], input[name='passwd']",
+        "submit_button": "input[type='submit'], button[type='submit']",
+        "next_button": "input[type='submit'], #idSIButton9",
+        "stay_signed_in": "#idBtn_Back"
+    })
+    
+    COMPOSE_SELECTORS = MappingProxyType({
+        "to_field": "input[aria-label*='To'], input[placeholder*='To'], .ms-TextField-input",
+        "subject_field": "input[aria-label*='Subject'], input[placeholder*='Subject'], .ms-TextField-input",
+        "content_field": "div[contenteditable='true'], .ms-Editor-content, iframe[title*='Message']",
+        "send_button": "button[aria-label*='Send'], .ms-Button--primary",
+        "compose_button": "button[aria-label*='New message'], .ms-Button--primary",
+        "compose_area": ".ms-ComposeHeader"
+    })
+    
+    NAVIGATION_SELECTORS = MappingProxyType({
+        "compose_button": "button[aria-label*='New message'], .ms-Button--primary",
+        "inbox_link": "a[href*='inbox'], button[aria-label*='Inbox']",
+        "sent_link": "a[href*='sent'], button[aria-label*='Sent']",
+        "drafts_link": "a[href*='drafts'], button[aria-label*='Drafts']"
+    })
+    
     def __init__(self, config: Config, browser_manager: BrowserManager):
         super().__init__(config, browser_manager)
         self.service_url = "https://outlook.live.com"
@@ -22,35 +53,20 @@ class OutlookAdapter(ProviderAdapter):
     def get_service_url(self) -> str:
         return self.service_url
     
-    def get_login_selectors(self) -> Dict[str, str]:
+    def get_compose_url(self) -> Optional[str]:
+        return "https://outlook.live.com/mail/0/deeplink/compose"
+    
+    def get_login_selectors(self) -> Mapping[str, str]:
         """Get Outlook-specific login selectors."""
-        return {
-            "email_field": "input[type='email'], input[name='loginfmt']",
-            "password_field": "input[type='password'], input[name='passwd']",
-            "submit_button": "input[type='submit'], button[type='submit']",
-            "next_button": "input[type='submit'], #idSIButton9",
-            "stay_signed_in": "#idBtn_Back"
-        }
-    
-    def get_compose_selectors(self) -> Dict[str, str]:
+        return self.LOGIN_SELECTORS
+    
+    def get_compose_selectors(self) -> Mapping[str, str]:
         """Get Outlook-specific compose selectors."""
-        return {
-            "to_field": "input[aria-label*='To'], input[placeholder*='To'], .ms-TextField-input",
-            "subject_field": "input[aria-label*='Subject'], input[placeholder*='Subject'], .ms-TextField-input",
-            "content_field": "div[contenteditable='true'], .ms-Editor-content, iframe[title*='Message']",
-            "send_button": "button[aria-label*='Send'], .ms-Button--primary",
-            "compose_button": "button[aria-label*='New message'], .ms-Button--primary",
-            "compose_area": ".ms-ComposeHeader"
-        }
-    
-    def get_navigation_selectors(self) -> Dict[str, str]:
+        return self.COMPOSE_SELECTORS
+    
+    def get_navigation_selectors(self) -> Mapping[str, str]:
         """Get Outlook-specific navigation selectors."""
-        return {
-            "compose_button": "button[aria-label*='New message'], .ms-Button--primary",
-            "inbox_link": "a[href*='inbox'], button[aria-label*='Inbox']",
-            "sent_link": "a[href*='sent'], button[aria-label*='Sent']",
-            "drafts_link": "a[href*='drafts'], button[aria-label*='Drafts']"
-        }
+        return self.NAVIGATION_SELECTORS
     
     async def login(self, credentials: Dict[str, str]) -> bool:
         """Login to Outlook."""
@@ -61,8 +77,10 @@ class OutlookAdapter(ProviderAdapter):
             if not await self.browser_manager.navigate(self.service_url):
                 return False
             
-            # Wait for page to load
-            await self._wait_for_page_load()
+            # Wait for either the signed-in app or the sign-in form
+            await self._wait_for_page_load(
+                expected_selector=f"{self.COMPOSE_SELECTORS['compose_button']}, {self.LOGIN_SELECTORS['email_field']}"
+            )
             
             # Check if already logged in
             if await self._is_already_logged_in():
@@ -81,83 +99,13 @@ class OutlookAdapter(ProviderAdapter):
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Outlook login exception: {e}")
+            self.logger.error("Outlook login exception: %s", e)
             await self._take_error_screenshot("outlook_login_exception")
             return False
     
     async def send_email(self, task_info: Dict[str, Any]) -> Dict[str, Any]:
         """Send email via Outlook."""
-        try:
-            self.logger.info("Starting Outlook email send process")
-            
-            # Validate task info
-            if not self._validate_task_info(task_info):
-                return {"success": False, "error": "Invalid task information"}
-            
-            # Navigate to Outlook if not already there
-            current_url = self.browser_manager.page.url
-            if "outlook.live.com" not in current_url:
-                if not await self.browser_manager.navigate(self.service_url):
-                    return {"success": False, "error": "Failed to navigate to Outlook"}
-            
-            # Wait for page to load
-            await self._wait_for_page_load()
-            
-            # Click compose button
-            compose_selectors = self.get_compose_selectors()
-            compose_button = compose_selectors["compose_button"]
-            
-            if not await self.browser_manager.click_element(compose_button):
-                return {"success": False, "error": "Failed to click compose button"}
-            
-            # Wait for compose area to load
-            await asyncio.sleep(3)
-            
-            # Fill recipient field
-            to_field = compose_selectors["to_field"]
-            recipients = self._format_recipients(task_info["recipients"])
-            
-            if not await self.browser_manager.type_text(to_field, recipients):
-                return {"success": False, "error": "Failed to fill recipient field"}
-            
-            # Press Tab to move to subject field
-            await self.browser_manager.page.keyboard.press("Tab")
-            await asyncio.sleep(1)
-            
-            # Fill subject field
-            subject = task_info.get("subject", "Message from automation system")
-            subject_field = compose_selectors["subject_field"]
-            
-            if not await self.browser_manager.type_text(subject_field, subject):
-                return {"success": False, "error": "Failed to fill subject field"}
-            
-            # Press Tab to move to content field
-            await self.browser_manager.page.keyboard.press("Tab")
-            await asyncio.sleep(1)
-            
-            # Fill content field
-            content = task_info["content"]
-            content_field = compose_selectors["content_field"]
-            
-            if not await self.browser_manager.type_text(content_field, content):
-                return {"success": False, "error": "Failed to fill content field"}
-            
-            # Send the email
-            send_button = compose_selectors["send_button"]
-            
-            if not await self.browser_manager.click_element(send_button):
-                return {"success": False, "error": "Failed to click send button"}
-            
-            # Wait for send to complete
-            await asyncio.sleep(3)
-            
-            self.logger.info("Outlook email sent successfully")
-            return {"success": True, "message": "Email sent successfully"}
-            
-        except Exception as e:
-            self.logger.error(f"Outlook send email exception: {e}")
-            await self._take_error_screenshot("outlook_send_failed")
-            return {"success": False, "error": str(e)}
+        return await self._send_email_impl(task_info, tab_between_fields=True)
     
     async def _handle_outlook_login(self, credentials: Dict[str, str]) -> bool:
         """Handle Outlook login process."""
@@ -174,11 +122,9 @@ class OutlookAdapter(ProviderAdapter):
             if not await self.browser_manager.click_element(next_button):
                 return False
             
-            # Wait for password field to appear
-            await asyncio.sleep(2)
-            
-            # Step 2: Enter password
+            # Step 2: Enter password once the field appears
             password_field = login_selectors["password_field"]
+            await self._wait_for(password_field)
             
             if not await self.browser_manager.type_text(password_field, credentials["password"]):
                 return False
@@ -188,8 +134,7 @@ class OutlookAdapter(ProviderAdapter):
             if not await self.browser_manager.click_element(submit_button):
                 return False
             
-            # Handle "Stay signed in" prompt if it appears
-            await asyncio.sleep(2)
+            # Handle "Stay signed in" prompt if it appears (click auto-waits for it)
             try:
                 stay_signed_in = login_selectors["stay_signed_in"]
                 await self.browser_manager.click_element(stay_signed_in)
@@ -197,32 +142,30 @@ class OutlookAdapter(ProviderAdapter):
                 # Stay signed in prompt might not appear
                 pass
             
-            # Wait for login to complete
-            await asyncio.sleep(5)
+            # Wait for login to complete (the mailbox shows the compose button)
+            await self._wait_for(self.get_compose_selectors()["compose_button"], timeout=15_000)
             
             # Check if login was successful
             return await self._is_already_logged_in()
             
         except Exception as e:
-            self.logger.error(f"Outlook login process failed: {e}")
+            self.logger.error("Outlook login process failed: %s", e)
             return False
     
     async def _is_already_logged_in(self) -> bool:
         """Check if already logged into Outlook."""
         try:
-            # Look for compose button or inbox
-            compose_selectors = self.get_compose_selectors()
-            compose_button = compose_selectors["compose_button"]
-            
-            # Wait a bit for page to load
-            await asyncio.sleep(2)
+            # The login page redirects away from the mail app, so the URL alone
+            # settles it without querying the DOM (a prefix match, since sign-in
+            # pages carry the mail app URL in their query string)
+            if self.browser_manager.page.url.startswith(self.LOGGED_IN_URL):
+                return True
             
-            # Check if compose button is visible
-            element = await self.browser_manager.page.query_selector(compose_button)
-            return element is not None
+            # Otherwise give the compose button a moment to show up
+            return await self._probe_logged_in()
             
         except Exception as e:
-            self.logger.warning(f"Error checking login status: {e}")
+            self.logger.warning("Error checking login status: %s", e)
             return False
     
     async def _wait_for_compose_area(self) -> bool:
@@ -235,5 +178,5 @@ class OutlookAdapter(ProviderAdapter):
             return True
             
         except Exception as e:
-            self.logger.warning(f"Compose area wait failed: {e}")
+            self.logger.warning("Compose area wait failed: %s", e)
             return False
@@ -2,45 +2,240 @@
 LLM Service for instruction interpretation and UI reasoning
 """
 
+import asyncio
+import copy
+import hashlib
+import html
 import json
 import re
-from typing import Dict, List, Optional, Any
-from openai import OpenAI
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Any, Set, Tuple
 from src.core.config import Config
+from src.utils.llm_cache import make_cache_key
 from src.utils.logger import get_logger
 
+# orjson is optional; fall back to the standard library when it's missing
+try:
+    import orjson
+    
+    def _dumps_indented(obj: Any) -> str:
+        # default=dict renders read-only mappings such as the fallback selectors
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=dict).decode("utf-8")
+    
+    # Raises orjson.JSONDecodeError, a subclass of json.JSONDecodeError
+    _loads = orjson.loads
+except ImportError:
+    def _dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2, default=dict)
+    
+    _loads = json.loads
+
+# Defaults for task fields the LLM may leave out, and the types each field must have
+_TASK_INFO_DEFAULTS = MappingProxyType({
+    "task_type": "email",
+    "action": "send",
+    "recipients": [],
+    "subject": "",
+    "content": "",
+    "attachments": [],
+    "provider_preference": "auto",
+    "urgency": "medium",
+    "additional_context": ""
+})
+
+_TASK_INFO_SCHEMA = {
+    "type": "object",
+    "properties": {
+        key: {
+            # Recipients may come back as one comma-separated string; it is split afterwards
+            "type": ["array", "string"] if key == "recipients" else ("array" if isinstance(default, list) else "string"),
+            "default": default
+        }
+        for key, default in _TASK_INFO_DEFAULTS.items()
+    }
+}
+
+# fastjsonschema is optional; without it defaults are filled in field by field
+try:
+    import fastjsonschema
+    
+    # Compiled once; fills in missing fields with their defaults while validating
+    _validate_task_schema = fastjsonschema.compile(_TASK_INFO_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    _validate_task_schema = None
+
+# lxml is optional; without it page HTML is simply truncated
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
 logger = get_logger(__name__)
 
-class LLMService:
-    """Service for LLM-powered instruction interpretation and reasoning."""
+# Email addresses in free text, compiled once at import
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+
+# Instructions simple enough to parse without the LLM, e.g.
+# "send email to a@example.com and b@example.com with subject 'Hi' saying 'Hello'"
+# or "email a@example.com: hello". After "saying" the message must be quoted
+# so a trailing clause ("... and then ...") is never taken as the content.
+SIMPLE_INSTRUCTION_RE = re.compile(
+    r"^\s*(?:send\s+(?:an?\s+)?)?(?:e-?mail|message)\s+(?:to\s+)?(?P<recipients>[^:'\"]+?)"
+    r"(?:\s+with\s+subject\s+(?P<sq>['\"])(?P<subject>.+?)(?P=sq))?"
+    r"(?:\s+saying\s+(?P<cq>['\"])(?P<quoted>.+?)(?P=cq)|\s*:\s*(?P<content>.+?))\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+# What may remain of the recipients part once its addresses are removed
+_RECIPIENT_SEPARATORS_RE = re.compile(r"^(?:\s|,|\band\b)*$", re.IGNORECASE)
+
+# Longest instruction tried on the fast path; anything longer goes to the LLM
+FAST_PARSE_MAX_LENGTH = 200
+
+# Most LLM responses kept in memory; the least recently used is dropped first
+PROMPT_CACHE_SIZE = 128
+
+# Token budget for page HTML sent to the DOM analysis (~4 characters per token)
+HTML_TOKEN_BUDGET = 2000
+
+# Elements the DOM analysis can act on, and how much each is worth keeping
+# when the page doesn't fit the budget
+_INTERACTIVE_XPATH = (
+    "//*[self::button or self::input or self::textarea or self::select or self::a"
+    " or self::form or self::iframe or @role or @contenteditable]"
+)
+_TAG_PRIORITY = {"button": 100, "input": 90, "a": 80, "form": 70, "textarea": 60, "select": 60, "iframe": 50}
+_INPUT_TYPE_PRIORITY = {"email": 95, "password": 95, "submit": 95}
+_ROLE_PRIORITY = {"button": 100, "textbox": 90, "link": 80}
+
+# Attributes worth showing the LLM for building selectors
+_KEPT_ATTRIBUTES = (
+    "id", "name", "type", "class", "role", "aria-label", "placeholder",
+    "title", "data-tooltip", "href", "contenteditable"
+)
+
+def _element_priority(element) -> int:
+    """Score how useful an element is to the DOM analysis."""
+    # Rich-text editors are where message bodies go
+    if element.get("contenteditable") == "true":
+        return 90
+    role = element.get("role")
+    if role in _ROLE_PRIORITY:
+        return _ROLE_PRIORITY[role]
+    if element.tag == "input":
+        return _INPUT_TYPE_PRIORITY.get(element.get("type", "").lower(), _TAG_PRIORITY["input"])
+    return _TAG_PRIORITY.get(element.tag, 10)
+
+def _summarize_element(element) -> str:
+    """Render an element as a single tag with its selector-relevant attributes and text."""
+    attributes = "".join(
+        f' {name}="{html.escape(element.get(name)[:100])}"'
+        for name in _KEPT_ATTRIBUTES if element.get(name) is not None
+    )
+    # Forms wrap the other elements, so their opening tag is enough; inputs have no content
+    if element.tag in ("form", "input"):
+        return f"<{element.tag}{attributes}>"
+    text = " ".join(element.text_content().split())[:80]
+    return f"<{element.tag}{attributes}>{html.escape(text)}</{element.tag}>"
+
+# Compacted HTML of the most recently seen pages, keyed by the SHA-256 of the
+# raw page so the cache never holds on to the full snapshots
+COMPACT_HTML_CACHE_SIZE = 32
+_compacted_pages: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
+def _compact_html(page_html: str, max_tokens: int = HTML_TOKEN_BUDGET) -> str:
+    """
+    Reduce page HTML to its interactive elements within a token budget.
     
-    def __init__(self, config: Config):
-        self.config = config
-        # Temporarily disable OpenAI client initialization
-        # self.client = OpenAI(
-        #     api_key=config.openai_api_key
-        # )
-        self.client = None
-        self.model = config.openai_model
+    Elements are kept in priority order until the budget is spent and emitted
+    in document order. Falls back to truncating the raw HTML if it can't be
+    parsed or has nothing interactive.
+    """
+    key = (hashlib.sha256(page_html.encode("utf-8")).hexdigest(), max_tokens)
+    compacted = _compacted_pages.get(key)
+    if compacted is not None:
+        _compacted_pages.move_to_end(key)
+        return compacted
     
-    async def interpret_instruction(self, instruction: str) -> Dict[str, Any]:
-        """
-        Interpret a natural language instruction and extract structured information.
-        
-        Args:
-            instruction: Natural language instruction
-            
-        Returns:
-            Structured task information
-        """
-        
-        prompt = f"""
+    compacted = _compact_page(page_html, max_tokens)
+    _compacted_pages[key] = compacted
+    if len(_compacted_pages) > COMPACT_HTML_CACHE_SIZE:
+        _compacted_pages.popitem(last=False)
+    return compacted
+
+def _compact_page(page_html: str, max_tokens: int) -> str:
+    """Compact page HTML; see _compact_html."""
+    max_chars = max_tokens * 4
+    
+    try:
+        if lxml_html is None:
+            raise ImportError("lxml is not installed")
+        elements = lxml_html.fromstring(page_html).xpath(_INTERACTIVE_XPATH)
+    except Exception as e:
+        logger.debug("Falling back to truncated HTML: %s", e)
+        elements = []
+    
+    if not elements:
+        return page_html if len(page_html) <= max_chars else page_html[:max_chars] + "..."
+    
+    summaries = [(_element_priority(element), index, _summarize_element(element)) for index, element in enumerate(elements)]
+    
+    kept = []
+    used = 0
+    for _, index, summary in sorted(summaries, key=lambda item: -item[0]):
+        if used + len(summary) > max_chars:
+            continue
+        kept.append((index, summary))
+        used += len(summary) + 1
+    
+    return "\n".join(summary for _, summary in sorted(kept))
+
+# Share of elements two page snapshots must have in common for the DOM
+# analysis to be sent as a diff against the previous one
+DOM_DIFF_THRESHOLD = 0.7
+
+def _element_overlap(a: Set[str], b: Set[str]) -> float:
+    """Get the Jaccard similarity of two sets of element signatures."""
+    union = a | b
+    return len(a & b) / len(union) if union else 1.0
+
+# Whitespace, separators and the opening bracket between streamed array elements
+_ARRAY_PADDING = " \t\r\n,["
+
+async def _iter_array_items(chunks: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Yield each element of a streamed JSON array as soon as it is complete."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip(_ARRAY_PADDING)
+            if not buffer or buffer[0] == "]":
+                break
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # The element hasn't fully arrived yet
+                break
+            yield item
+            buffer = buffer[end:]
+    
+    if buffer.strip().lstrip("]").strip():
+        raise json.JSONDecodeError("Invalid JSON array", buffer, 0)
+
+# Fixed text of the prompts, around the parts filled in per call
+_INTERPRET_PROMPT_PREFIX = '''
         You are an AI assistant that interprets natural language instructions for web automation tasks.
         
-        Given the instruction: "{instruction}"
+        Given the instruction: "'''
+
+_INTERPRET_PROMPT_SUFFIX = '''"
         
         Please extract the following information in JSON format:
-        {{
+        {
             "task_type": "email|upload|schedule|ticket|post",
             "action": "send|upload|schedule|submit|post",
             "recipients": ["email1@example.com", "email2@example.com"],
@@ -50,7 +245,7 @@ class LLMService:
             "provider_preference": "gmail|outlook|auto",
             "urgency": "high|medium|low",
             "additional_context": "any other relevant information"
-        }}
+        }
         
         Rules:
         - For email tasks, extract recipients, subject, and content
@@ -60,72 +255,42 @@ class LLMService:
         - For non-email tasks, adapt the structure appropriately
         
         Return only valid JSON.
-        """
-        
-        try:
-            response = self._call_llm(prompt)
-            result = json.loads(response)
-            
-            # Validate and clean the result
-            result = self._validate_task_info(result)
-            
-            logger.info(f"Interpreted instruction: {result['task_type']} task")
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
-            # Fallback to basic parsing
-            return self._fallback_parsing(instruction)
-        except Exception as e:
-            logger.error(f"LLM interpretation failed: {e}")
-            return self._fallback_parsing(instruction)
-    
-    async def analyze_dom_structure(self, html_content: str, task_context: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Analyze DOM structure to identify relevant elements for the task.
-        
-        Args:
-            html_content: HTML content of the page
-            task_context: Context about the task being performed
-            
-        Returns:
-            Analysis results with element selectors and actions
-        """
-        
-        # Truncate HTML if too long
-        if len(html_content) > 8000:
-            html_content = html_content[:8000] + "..."
-        
-        prompt = f"""
+        '''
+
+_DOM_PROMPT_PREFIX = """
         You are analyzing a web page's DOM structure to identify elements for automation.
         
-        Task Context: {json.dumps(task_context, indent=2)}
+        Task Context: """
+
+_DOM_PROMPT_HTML_HEADER = """
         
         HTML Content:
-        {html_content}
+        """
+
+_DOM_PROMPT_SUFFIX = """
         
         Please identify the following elements and provide CSS selectors or XPath expressions:
-        {{
-            "login_form": {{
+        {
+            "login_form": {
                 "email_field": "selector for email input",
                 "password_field": "selector for password input",
                 "submit_button": "selector for login button"
-            }},
-            "compose_form": {{
+            },
+            "compose_form": {
                 "to_field": "selector for recipient field",
                 "subject_field": "selector for subject field",
                 "content_field": "selector for message content",
                 "send_button": "selector for send button"
-            }},
-            "navigation": {{
+            },
+            "navigation": {
                 "compose_button": "selector for compose/new message button",
                 "inbox_link": "selector for inbox navigation"
-            }},
-            "page_state": {{
+            },
+            "page_state": {
                 "is_logged_in": "true/false based on page content",
                 "current_page": "login|compose|inbox|other"
-            }}
-        }}
+            }
+        }
         
         Provide the most reliable selectors possible. Prefer:
         1. IDs
@@ -135,51 +300,32 @@ class LLMService:
         
         Return only valid JSON.
         """
-        
-        try:
-            response = self._call_llm(prompt)
-            result = json.loads(response)
-            
-            logger.info("DOM structure analysis completed")
-            return result
-            
-        except Exception as e:
-            logger.error(f"DOM analysis failed: {e}")
-            return self._get_fallback_selectors()
-    
-    async def generate_action_plan(self, task_info: Dict[str, Any], dom_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """
-        Generate a step-by-step action plan based on task and DOM analysis.
-        
-        Args:
-            task_info: Structured task information
-            dom_analysis: DOM structure analysis
-            
-        Returns:
-            List of actions to perform
-        """
-        
-        prompt = f"""
+
+_PLAN_PROMPT_PREFIX = """
         You are generating a step-by-step action plan for web automation.
         
-        Task Information: {json.dumps(task_info, indent=2)}
-        DOM Analysis: {json.dumps(dom_analysis, indent=2)}
+        Task Information: """
+
+_PLAN_PROMPT_DOM_HEADER = """
+        DOM Analysis: """
+
+_PLAN_PROMPT_SUFFIX = """
         
         Generate a list of actions in JSON format:
         [
-            {{
+            {
                 "step": 1,
                 "action": "navigate|click|type|wait|verify",
                 "target": "selector or URL",
                 "value": "text to type or expected value",
                 "description": "human readable description",
                 "fallback_actions": [
-                    {{
+                    {
                         "action": "alternative action if primary fails",
                         "target": "alternative selector"
-                    }}
+                    }
                 ]
-            }}
+            }
         ]
         
         Include actions for:
@@ -192,114 +338,444 @@ class LLMService:
         
         Return only valid JSON array.
         """
+
+# Mock LLM results used while the OpenAI client is disabled, built once
+_MOCK_INTERPRET = {
+    "task_type": "email",
+    "action": "send",
+    "recipients": ["demo@example.com"],
+    "subject": "Test email from automation",
+    "content": "This is a test email from the automation system",
+    "attachments": [],
+    "provider_preference": "auto",
+    "urgency": "medium",
+    "additional_context": ""
+}
+
+_MOCK_ANALYZE = {
+    "login_form": {
+        "email_field": "input[type='email']",
+        "password_field": "input[type='password']",
+        "submit_button": "button[type='submit']"
+    },
+    "compose_form": {
+        "to_field": "input[name*='to']",
+        "subject_field": "input[name*='subject']",
+        "content_field": "textarea",
+        "send_button": "button:contains('Send')"
+    },
+    "navigation": {
+        "compose_button": "button:contains('Compose')",
+        "inbox_link": "a:contains('Inbox')"
+    },
+    "page_state": {
+        "is_logged_in": "false",
+        "current_page": "login"
+    }
+}
+
+_MOCK_PLAN = [
+    {
+        "step": 1,
+        "action": "navigate",
+        "target": "https://gmail.com",
+        "value": "",
+        "description": "Navigate to Gmail",
+        "fallback_actions": []
+    }
+]
+
+# Selectors used when DOM analysis fails; shared read-only by every caller
+_FALLBACK_SELECTORS = MappingProxyType({
+    "login_form": MappingProxyType({
+        "email_field": "input[type='email'], input[name*='email'], input[id*='email']",
+        "password_field": "input[type='password']",
+        "submit_button": "button[type='submit'], input[type='submit']"
+    }),
+    "compose_form": MappingProxyType({
+        "to_field": "input[name*='to'], input[id*='to'], textarea[name*='to']",
+        "subject_field": "input[name*='subject'], input[id*='subject']",
+        "content_field": "textarea, div[contenteditable='true'], iframe[title*='Message']",
+        "send_button": "button[type='submit'], input[type='submit'], button:contains('Send')"
+    }),
+    "navigation": MappingProxyType({
+        "compose_button": "button:contains('Compose'), button:contains('New'), a:contains('Compose')",
+        "inbox_link": "a:contains('Inbox'), a[href*='inbox']"
+    }),
+    "page_state": MappingProxyType({
+        "is_logged_in": "false",
+        "current_page": "unknown"
+    })
+})
+
+# Action plan used when generation fails; "value" templates are filled in
+# from the task's recipients, subject and content
+_DEFAULT_PLAN_TEMPLATE = (
+    MappingProxyType({
+        "step": 1,
+        "action": "navigate",
+        "target": "https://gmail.com",
+        "value": "",
+        "description": "Navigate to Gmail",
+        "fallback_actions": ()
+    }),
+    MappingProxyType({
+        "step": 2,
+        "action": "click",
+        "target": "button:contains('Compose')",
+        "value": "",
+        "description": "Click compose button",
+        "fallback_actions": ()
+    }),
+    MappingProxyType({
+        "step": 3,
+        "action": "type",
+        "target": "input[name*='to']",
+        "value": "{recipients}",
+        "description": "Enter recipient email",
+        "fallback_actions": ()
+    }),
+    MappingProxyType({
+        "step": 4,
+        "action": "type",
+        "target": "input[name*='subject']",
+        "value": "{subject}",
+        "description": "Enter subject",
+        "fallback_actions": ()
+    }),
+    MappingProxyType({
+        "step": 5,
+        "action": "type",
+        "target": "textarea, div[contenteditable='true']",
+        "value": "{content}",
+        "description": "Enter message content",
+        "fallback_actions": ()
+    }),
+    MappingProxyType({
+        "step": 6,
+        "action": "click",
+        "target": "button:contains('Send')",
+        "value": "",
+        "description": "Send the email",
+        "fallback_actions": ()
+    })
+)
+
+_MOCK_INTERPRET_JSON = json.dumps(_MOCK_INTERPRET)
+_MOCK_ANALYZE_JSON = json.dumps(_MOCK_ANALYZE)
+_MOCK_PLAN_JSON = json.dumps(_MOCK_PLAN)
+
+class LLMService:
+    """Service for LLM-powered instruction interpretation and reasoning."""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        # Temporarily disable OpenAI client initialization
+        # (import the client here so the SDK is only loaded when it's used)
+        # from openai import AsyncOpenAI
+        # self.client = AsyncOpenAI(
+        #     api_key=config.openai_api_key
+        # )
+        self.client = None
+        self.model = config.openai_model
+        
+        # Responses to prompts already sent, reused when caching is switched on
+        self._cache: Optional["OrderedDict[str, str]"] = OrderedDict() if config.llm_cache_enabled else None
+        self.stats = {"hits": 0, "misses": 0}
+        
+        # The last page analysed, so repeat snapshots of it can be answered
+        # without the LLM or sent as a diff
+        self._last_html_hash: Optional[str] = None
+        self._last_elements: Set[str] = set()
+        self._last_analysis: Optional[Dict[str, Any]] = None
+    
+    async def interpret_instruction(self, instruction: str) -> Dict[str, Any]:
+        """
+        Interpret a natural language instruction and extract structured information.
+        
+        Args:
+            instruction: Natural language instruction
+            
+        Returns:
+            Structured task information
+        """
+        
+        # Simple one-line emails don't need an LLM round trip
+        task_info = self._try_fast_parse(instruction)
+        if task_info is not None:
+            logger.info("Interpreted instruction with fast-path parse")
+            return task_info
+        
+        prompt = _INTERPRET_PROMPT_PREFIX + instruction + _INTERPRET_PROMPT_SUFFIX
         
         try:
-            response = self._call_llm(prompt)
-            actions = json.loads(response)
+            result = await self._call_llm_json(prompt)
             
-            logger.info(f"Generated action plan with {len(actions)} steps")
-            return actions
+            # Validate and clean the result
+            result = self._validate_task_info(result)
             
+            logger.info("Interpreted instruction: %s task", result['task_type'])
+            return result
+            
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse LLM response as JSON: %s", e)
+            # Fallback to basic parsing
+            return self._fallback_parsing(instruction)
         except Exception as e:
-            logger.error(f"Action plan generation failed: {e}")
-            return self._get_default_action_plan(task_info)
+            logger.error("LLM interpretation failed: %s", e)
+            return self._fallback_parsing(instruction)
     
-    def _call_llm(self, prompt: str) -> str:
-        """Make a call to the LLM API."""
+    async def interpret_many(self, instructions: List[str], concurrency: int = 4) -> List[Dict[str, Any]]:
+        """
+        Interpret several instructions concurrently.
+        
+        Args:
+            instructions: Natural language instructions
+            concurrency: Maximum number of LLM requests in flight at once
+            
+        Returns:
+            Structured task information for each instruction, in order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def interpret(instruction: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.interpret_instruction(instruction)
+        
+        return await asyncio.gather(*(interpret(instruction) for instruction in instructions))
+    
+    async def analyze_dom_structure(self, html_content: str, task_context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze DOM structure to identify relevant elements for the task.
+        
+        Args:
+            html_content: HTML content of the page
+            task_context: Context about the task being performed
+            
+        Returns:
+            Analysis results with element selectors and actions
+        """
+        
+        # Keep only the elements the analysis can act on, within the token budget
+        html_content = _compact_html(html_content)
+        
+        html_hash = hashlib.sha256(html_content.encode("utf-8")).hexdigest()[:16]
+        if html_hash == self._last_html_hash:
+            logger.info("Page unchanged since the last DOM analysis, reusing it")
+            return self._last_analysis
+        
+        # One summarized element per line
+        elements = set(html_content.splitlines())
+        
+        if self._last_analysis is not None and _element_overlap(elements, self._last_elements) > DOM_DIFF_THRESHOLD:
+            prompt = self._dom_diff_prompt(task_context, elements)
+        else:
+            prompt = self._dom_analysis_prompt(task_context, html_content)
+        
+        try:
+            result = await self._call_llm_json(prompt)
+            
+            self._last_html_hash = html_hash
+            self._last_elements = elements
+            self._last_analysis = result
+            
+            logger.info("DOM structure analysis completed")
+            return result
+            
+        except Exception as e:
+            logger.error("DOM analysis failed: %s", e)
+            return self._get_fallback_selectors()
+    
+    def _dom_analysis_prompt(self, task_context: Dict[str, Any], html_content: str) -> str:
+        """Build the prompt for analysing a page from scratch."""
+        return "".join((
+            _DOM_PROMPT_PREFIX,
+            _dumps_indented(task_context),
+            _DOM_PROMPT_HTML_HEADER,
+            html_content,
+            _DOM_PROMPT_SUFFIX
+        ))
+    
+    def _dom_diff_prompt(self, task_context: Dict[str, Any], elements: Set[str]) -> str:
+        """Build the prompt for updating the previous analysis after a small page change."""
+        added = "\n".join(sorted(elements - self._last_elements)) or "(none)"
+        removed = "\n".join(sorted(self._last_elements - elements)) or "(none)"
+        
+        return f"""
+        You are analyzing a web page's DOM structure to identify elements for automation.
+        The page has changed slightly since you last analyzed it.
+        
+        Task Context: {_dumps_indented(task_context)}
+        
+        Previous Analysis: {_dumps_indented(self._last_analysis)}
+        
+        Elements added since then:
+        {added}
+        
+        Elements removed since then:
+        {removed}
+        
+        Update the previous analysis for these changes, keeping selectors that
+        still apply. Return the complete analysis in the same JSON format.
+        
+        Return only valid JSON.
+        """
+    
+    async def generate_action_plan(self, task_info: Dict[str, Any], dom_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Generate a step-by-step action plan based on task and DOM analysis.
+        
+        Args:
+            task_info: Structured task information
+            dom_analysis: DOM structure analysis
+            
+        Returns:
+            List of actions to perform
+        """
+        return [action async for action in self.stream_action_plan(task_info, dom_analysis)]
+    
+    async def stream_action_plan(self, task_info: Dict[str, Any], dom_analysis: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate an action plan, yielding each action as soon as the LLM has produced it.
+        
+        Args:
+            task_info: Structured task information
+            dom_analysis: DOM structure analysis
+            
+        Yields:
+            Actions to perform, in order
+        """
+        
+        prompt = "".join((
+            _PLAN_PROMPT_PREFIX,
+            _dumps_indented(task_info),
+            _PLAN_PROMPT_DOM_HEADER,
+            _dumps_indented(dom_analysis),
+            _PLAN_PROMPT_SUFFIX
+        ))
+        
+        count = 0
+        try:
+            async for action in _iter_array_items(self._stream_llm(prompt)):
+                count += 1
+                yield action
+            
+        except Exception as e:
+            logger.error("Action plan generation failed: %s", e)
+            # Steps already handed out may have run; only fall back if none were
+            if not count:
+                for action in self._get_default_action_plan(task_info):
+                    yield action
+            return
+        
+        logger.info("Generated action plan with %s steps", count)
+    
+    async def _call_llm_json(self, prompt: str) -> Any:
+        """Make a call to the LLM API and parse its JSON response."""
+        # The mock results are kept parsed, so there is nothing to decode
+        if self.client is None:
+            logger.warning("Using mock LLM response for testing")
+            return self._get_mock_parsed(prompt)
+        
+        return _loads(await self._call_llm(prompt))
+    
+    async def _call_llm(self, prompt: str) -> str:
+        """Make a call to the LLM API, reusing the response to an identical earlier prompt."""
+        if self._cache is None:
+            return await self._request_llm(prompt)
+        
+        key = make_cache_key(model=self.model, temperature=self.config.openai_temperature, prompt=prompt)
+        response = self._cache.get(key)
+        if response is not None:
+            self.stats["hits"] += 1
+            self._cache.move_to_end(key)
+            return response
+        
+        self.stats["misses"] += 1
+        response = await self._request_llm(prompt)
+        self._cache[key] = response
+        if len(self._cache) > PROMPT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return response
+    
+    async def _stream_llm(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the LLM's response to a prompt as it is generated."""
+        # The mock response arrives as a single chunk
+        yield await self._call_llm(prompt)
+        
+        # Uncomment below when OpenAI client issue is resolved
+        # stream = await self.client.chat.completions.create(
+        #     model=self.model,
+        #     messages=[
+        #         {"role": "system", "content": "You are a helpful AI assistant for web automation tasks."},
+        #         {"role": "user", "content": prompt}
+        #     ],
+        #     temperature=self.config.openai_temperature,
+        #     max_tokens=2000,
+        #     stream=True
+        # )
+        # 
+        # async for chunk in stream:
+        #     delta = chunk.choices[0].delta.content
+        #     if delta:
+        #         yield delta
+    
+    async def _request_llm(self, prompt: str) -> str:
+        """Send a prompt to the LLM API."""
         try:
             # For now, let's use a mock response to test the system
             logger.warning("Using mock LLM response for testing")
             return self._get_mock_response(prompt)
             
             # Uncomment below when OpenAI client issue is resolved
-            # response = self.client.chat.completions.create(
+            # response = await self.client.chat.completions.create(
             #     model=self.model,
             #     messages=[
             #         {"role": "system", "content": "You are a helpful AI assistant for web automation tasks."},
             #         {"role": "user", "content": prompt}
             #     ],
-            #     temperature=0.1,
+            #     temperature=self.config.openai_temperature,
             #     max_tokens=2000
             # )
             # 
             # return response.choices[0].message.content.strip()
             
         except Exception as e:
-            logger.error(f"LLM API call failed: {e}")
+            logger.error("LLM API call failed: %s", e)
             raise
     
+    def _get_mock_parsed(self, prompt: str) -> Any:
+        """Get a mock result for testing purposes, already parsed."""
+        lowered = prompt.lower()
+        if "interpret" in lowered:
+            mock = _MOCK_INTERPRET
+        elif "analyze" in lowered:
+            mock = _MOCK_ANALYZE
+        else:
+            mock = _MOCK_PLAN
+        # Callers fill in and edit their results, so never hand out the constant itself
+        return copy.deepcopy(mock)
+    
     def _get_mock_response(self, prompt: str) -> str:
         """Get a mock response for testing purposes."""
-        if "interpret" in prompt.lower():
-            return '''{
-                "task_type": "email",
-                "action": "send",
-                "recipients": ["demo@example.com"],
-                "subject": "Test email from automation",
-                "content": "This is a test email from the automation system",
-                "attachments": [],
-                "provider_preference": "auto",
-                "urgency": "medium",
-                "additional_context": ""
-            }'''
-        elif "analyze" in prompt.lower():
-            return '''{
-                "login_form": {
-                    "email_field": "input[type='email']",
-                    "password_field": "input[type='password']",
-                    "submit_button": "button[type='submit']"
-                },
-                "compose_form": {
-                    "to_field": "input[name*='to']",
-                    "subject_field": "input[name*='subject']",
-                    "content_field": "textarea",
-                    "send_button": "button:contains('Send')"
-                },
-                "navigation": {
-                    "compose_button": "button:contains('Compose')",
-                    "inbox_link": "a:contains('Inbox')"
-                },
-                "page_state": {
-                    "is_logged_in": "false",
-                    "current_page": "login"
-                }
-            }'''
+        lowered = prompt.lower()
+        if "interpret" in lowered:
+            return _MOCK_INTERPRET_JSON
+        elif "analyze" in lowered:
+            return _MOCK_ANALYZE_JSON
         else:
-            return '''[
-                {
-                    "step": 1,
-                    "action": "navigate",
-                    "target": "https://gmail.com",
-                    "value": "",
-                    "description": "Navigate to Gmail",
-                    "fallback_actions": []
-                }
-            ]'''
+            return _MOCK_PLAN_JSON
     
     def _validate_task_info(self, task_info: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and clean task information."""
         
         # Ensure required fields exist
-        defaults = {
-            "task_type": "email",
-            "action": "send",
-            "recipients": [],
-            "subject": "",
-            "content": "",
-            "attachments": [],
-            "provider_preference": "auto",
-            "urgency": "medium",
-            "additional_context": ""
-        }
-        
-        for key, default_value in defaults.items():
-            if key not in task_info:
-                task_info[key] = default_value
+        task_info = self._apply_task_defaults(task_info)
         
         # Clean recipients
         if isinstance(task_info["recipients"], str):
             # Extract emails from string
-            emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', task_info["recipients"])
+            emails = EMAIL_RE.findall(task_info["recipients"])
             task_info["recipients"] = emails
         
         # Generate subject if missing
@@ -308,6 +784,19 @@ class LLMService:
         
         return task_info
     
+    def _apply_task_defaults(self, task_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in missing task fields, checking field types against the compiled schema when available."""
+        if _validate_task_schema is not None:
+            try:
+                return _validate_task_schema(task_info)
+            except fastjsonschema.JsonSchemaException as e:
+                logger.warning("Task info doesn't match the expected schema: %s", e)
+        
+        for key, default_value in _TASK_INFO_DEFAULTS.items():
+            if key not in task_info:
+                task_info[key] = copy.copy(default_value)
+        return task_info
+    
     def _generate_subject(self, content: str) -> str:
         """Generate a subject line from content."""
         # Simple subject generation
@@ -317,12 +806,38 @@ class LLMService:
             subject = subject[:47] + "..."
         return subject
     
+    def _try_fast_parse(self, instruction: str) -> Optional[Dict[str, Any]]:
+        """Parse a short, single-email instruction without the LLM, or return None."""
+        if len(instruction) >= FAST_PARSE_MAX_LENGTH:
+            return None
+        
+        match = SIMPLE_INSTRUCTION_RE.match(instruction)
+        if match is None:
+            return None
+        
+        # The recipients part must be nothing but addresses
+        recipients_part = match["recipients"]
+        recipients = EMAIL_RE.findall(recipients_part)
+        if not recipients or not _RECIPIENT_SEPARATORS_RE.match(EMAIL_RE.sub("", recipients_part)):
+            return None
+        
+        # Another address or "to: body" clause means several emails; let the LLM split them
+        content = match["quoted"] or match["content"]
+        if EMAIL_RE.search(content) or ":" in content:
+            return None
+        
+        return self._validate_task_info({
+            "recipients": recipients,
+            "subject": match["subject"] or "",
+            "content": content
+        })
+    
     def _fallback_parsing(self, instruction: str) -> Dict[str, Any]:
         """Fallback parsing when LLM fails."""
         logger.warning("Using fallback parsing for instruction")
         
         # Basic email detection
-        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', instruction)
+        emails = EMAIL_RE.findall(instruction)
         
         return {
             "task_type": "email",
@@ -336,79 +851,15 @@ class LLMService:
             "additional_context": ""
         }
     
-    def _get_fallback_selectors(self) -> Dict[str, Any]:
+    def _get_fallback_selectors(self) -> Mapping[str, Any]:
         """Get fallback selectors when DOM analysis fails."""
-        return {
-            "login_form": {
-                "email_field": "input[type='email'], input[name*='email'], input[id*='email']",
-                "password_field": "input[type='password']",
-                "submit_button": "button[type='submit'], input[type='submit']"
-            },
-            "compose_form": {
-                "to_field": "input[name*='to'], input[id*='to'], textarea[name*='to']",
-                "subject_field": "input[name*='subject'], input[id*='subject']",
-                "content_field": "textarea, div[contenteditable='true'], iframe[title*='Message']",
-                "send_button": "button[type='submit'], input[type='submit'], button:contains('Send')"
-            },
-            "navigation": {
-                "compose_button": "button:contains('Compose'), button:contains('New'), a:contains('Compose')",
-                "inbox_link": "a:contains('Inbox'), a[href*='inbox']"
-            },
-            "page_state": {
-                "is_logged_in": "false",
-                "current_page": "unknown"
-            }
-        }
+        return _FALLBACK_SELECTORS
     
     def _get_default_action_plan(self, task_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get default action plan when generation fails."""
-        return [
-            {
-                "step": 1,
-                "action": "navigate",
-                "target": "https://gmail.com",
-                "value": "",
-                "description": "Navigate to Gmail",
-                "fallback_actions": []
-            },
-            {
-                "step": 2,
-                "action": "click",
-                "target": "button:contains('Compose')",
-                "value": "",
-                "description": "Click compose button",
-                "fallback_actions": []
-            },
-            {
-                "step": 3,
-                "action": "type",
-                "target": "input[name*='to']",
-                "value": ", ".join(task_info.get("recipients", [])),
-                "description": "Enter recipient email",
-                "fallback_actions": []
-            },
-            {
-                "step": 4,
-                "action": "type",
-                "target": "input[name*='subject']",
-                "value": task_info.get("subject", ""),
-                "description": "Enter subject",
-                "fallback_actions": []
-            },
-            {
-                "step": 5,
-                "action": "type",
-                "target": "textarea, div[contenteditable='true']",
-                "value": task_info.get("content", ""),
-                "description": "Enter message content",
-                "fallback_actions": []
-            },
-            {
-                "step": 6,
-                "action": "click",
-                "target": "button:contains('Send')",
-                "value": "",
-                "description": "Send the email",
-                "fallback_actions": []
-            }
-        ]
+        values = {
+            "recipients": ", ".join(task_info.get("recipients", [])),
+            "subject": task_info.get("subject", ""),
+            "content": task_info.get("content", "")
+        }
+        return [dict(step, value=step["value"].format_map(values)) for step in _DEFAULT_PLAN_TEMPLATE]
@@ -0,0 +1,23 @@
+"""
+Environment helpers for the Cross-Platform Action Agent
+"""
+
+import functools
+import os
+from typing import Dict
+from dotenv import load_dotenv
+
+_env_loaded = False
+
+def load_env():
+    """Load variables from the .env file once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv(override=False)
+        _env_loaded = True
+
+@functools.lru_cache(maxsize=1)
+def env_snapshot() -> Dict[str, str]:
+    """Get a snapshot of the environment taken after the .env file is loaded."""
+    load_env()
+    return dict(os.environ)
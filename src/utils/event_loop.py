@@ -0,0 +1,44 @@
+"""
+Event loop helpers for the Cross-Platform Action Agent
+"""
+
+import asyncio
+import sys
+from typing import Any, Coroutine
+
+# uvloop is optional and not available on Windows
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+else:
+    uvloop = None
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, preferring uvloop and eager task execution."""
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    
+    # Run new tasks inline until their first real suspension (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    
+    return loop
+
+def run(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion on the fastest available event loop.
+
+    Args:
+        main: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=new_event_loop) as runner:
+            return runner.run(main)
+
+    if uvloop is not None:
+        uvloop.install()
+    return asyncio.run(main)
@@ -0,0 +1,71 @@
+"""
+On-disk cache for deterministic LLM results
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+# orjson is optional; fall back to the standard library when it's missing
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+    
+    _loads = json.loads
+
+def make_cache_key(**parts: Any) -> str:
+    """Build a stable cache key from keyword parts."""
+    return hashlib.sha256(_dumps(parts)).hexdigest()
+
+class DiskCache:
+    """SQLite-backed key/value cache with per-entry expiry."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired."""
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if expires_at < time.time():
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        return _loads(value)
+
+    def set(self, key: str, value: Any, ttl: int):
+        """Store a JSON-serializable value for ttl seconds."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, _dumps(value), time.time() + ttl)
+        )
+        self._conn.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -2,29 +2,68 @@
 Logging utilities for the Cross-Platform Action Agent
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-from rich.logging import RichHandler
-from rich.console import Console
-from rich.theme import Theme
+
+# Most recent actions an ActionLogger keeps for reporting
+MAX_LOGGED_ACTIONS = 2000
+
+# Rich is imported by setup_logger; modules that only log don't need it
 
 # Create logs directory
 logs_dir = Path("logs")
 logs_dir.mkdir(exist_ok=True)
 
 # Custom theme for rich logging
-custom_theme = Theme({
+THEME_STYLES = {
     "info": "cyan",
     "warning": "yellow",
     "error": "red",
     "success": "green",
     "debug": "dim"
-})
+}
+
+_console = None
+
+def get_console():
+    """Get the shared Rich console used for log output, creating it on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        from rich.theme import Theme
+        _console = Console(theme=Theme(THEME_STYLES))
+    return _console
+
+# Background listeners that render and write records for each set-up logger
+_listeners = {}
+
+def _stop_listeners():
+    """Flush and stop every background log listener."""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+atexit.register(_stop_listeners)
 
-console = Console(theme=custom_theme)
+class _ExcInfoQueueHandler(QueueHandler):
+    """Queue handler that leaves exception info on records for the listener's handlers."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() renders the traceback into the message and clears
+        # exc_info, which would stop RichHandler drawing rich tracebacks
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 def setup_logger(
     name: str = "action_agent",
@@ -47,8 +86,11 @@ def setup_logger(
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
-    # Clear existing handlers
+    # Clear existing handlers, flushing the listener behind them
     logger.handlers.clear()
+    previous = _listeners.pop(name, None)
+    if previous is not None:
+        previous.stop()
     
     # Create formatters
     console_formatter = logging.Formatter(
@@ -61,9 +103,11 @@ def setup_logger(
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     
+    from rich.logging import RichHandler
+    
     # Console handler with rich formatting
     console_handler = RichHandler(
-        console=console,
+        console=get_console(),
         show_time=True,
         show_path=False,
         markup=True,
@@ -71,7 +115,6 @@ def setup_logger(
     )
     console_handler.setLevel(level)
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
     
     # File handler
     if log_file is None:
@@ -81,7 +124,15 @@ def setup_logger(
     file_handler = logging.FileHandler(log_file, encoding='utf-8')
     file_handler.setLevel(level)
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    
+    # Callers only enqueue records; rendering and file writes happen on the
+    # listener's thread so they never stall the event loop
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_ExcInfoQueueHandler(log_queue))
+    
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
     
     return logger
 
@@ -89,58 +140,69 @@ def get_logger(name: str = "action_agent") -> logging.Logger:
     """Get a logger instance."""
     return logging.getLogger(name)
 
+def _fmt_ts(ns: int) -> str:
+    """Format a time.time_ns() timestamp as a local ISO 8601 string."""
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=remainder // 1000).isoformat()
+
 class ActionLogger:
     """Specialized logger for action execution tracking."""
     
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, max_actions: int = MAX_LOGGED_ACTIONS):
         self.logger = logger
-        self.actions = []
+        # Oldest actions are dropped once the limit is reached
+        self.actions = deque(maxlen=max_actions)
     
     def log_action(self, action: str, success: bool = True, details: Optional[str] = None):
         """Log an action with success/failure status."""
         status = "✅" if success else "❌"
-        message = f"{status} {action}"
         
         if details:
-            message += f" - {details}"
-        
-        self.logger.info(message)
+            self.logger.info("%s %s - %s", status, action, details)
+        else:
+            self.logger.info("%s %s", status, action)
         
         # Store action for reporting
         self.actions.append({
             "action": action,
             "success": success,
             "details": details,
-            "timestamp": datetime.now().isoformat()
+            "timestamp_ns": time.time_ns()
         })
     
     def log_step(self, step: str, description: Optional[str] = None):
         """Log a step in the process."""
-        message = f"🔹 {step}"
         if description:
-            message += f": {description}"
-        
-        self.logger.info(message)
+            self.logger.info("🔹 %s: %s", step, description)
+        else:
+            self.logger.info("🔹 %s", step)
     
     def log_warning(self, message: str):
         """Log a warning."""
-        self.logger.warning(f"⚠️  {message}")
+        self.logger.warning("⚠️  %s", message)
     
     def log_error(self, message: str, exception: Optional[Exception] = None):
         """Log an error."""
-        error_msg = f"❌ {message}"
         if exception:
-            error_msg += f" - {str(exception)}"
-        
-        self.logger.error(error_msg, exc_info=exception is not None)
+            self.logger.error("❌ %s - %s", message, exception, exc_info=exception)
+        else:
+            self.logger.error("❌ %s", message)
     
     def log_success(self, message: str):
         """Log a success message."""
-        self.logger.info(f"✅ {message}")
+        self.logger.info("✅ %s", message)
     
     def get_actions(self) -> list:
-        """Get all logged actions."""
-        return self.actions.copy()
+        """Get all logged actions, with their timestamps formatted."""
+        return [
+            {
+                "action": action["action"],
+                "success": action["success"],
+                "details": action["details"],
+                "timestamp": _fmt_ts(action["timestamp_ns"])
+            }
+            for action in self.actions
+        ]
     
     def clear_actions(self):
         """Clear the action log."""
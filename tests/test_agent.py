@@ -7,7 +7,23 @@ import asyncio
 from unittest.mock import Mock, patch, AsyncMock
 from src.core.config import Config
 from src.core.agent import GenericUIAgent
-from src.services.llm_service import LLMService
+from src.services.llm_service import LLMService, PROMPT_CACHE_SIZE, _compact_html
+from src.automation.browser_manager import BrowserManager, BrowserPool
+from src.providers.gmail_adapter import GmailAdapter
+from src.utils.llm_cache import DiskCache, make_cache_key
+
+def make_async_stub(value):
+    """Create a coroutine function that returns value and records its calls."""
+    async def stub(*args, **kwargs):
+        stub.calls.append((args, kwargs))
+        return value
+    stub.calls = []
+    return stub
+
+@pytest.fixture(scope="module")
+def config():
+    """Create a default configuration; Config is frozen, so tests can share it."""
+    return Config()
 
 class TestGenericUIAgent:
     """Test cases for the GenericUIAgent class."""
@@ -26,6 +42,8 @@ class TestGenericUIAgent:
             "password": "test_password"
         }
         config.validate.return_value = True
+        config.llm_cache_enabled = False
+        config.max_concurrent_tasks = 8
         return config
     
     @pytest.fixture
@@ -41,7 +59,7 @@ class TestGenericUIAgent:
         assert agent.action_logger is not None
     
     @pytest.mark.asyncio
-    async def test_instruction_interpretation(self, agent):
+    async def test_instruction_interpretation(self, agent, monkeypatch):
         """Test instruction interpretation."""
         # Mock the LLM service response
         mock_task_info = {
@@ -53,12 +71,46 @@ class TestGenericUIAgent:
             "provider_preference": "auto"
         }
         
-        agent.llm_service.interpret_instruction = AsyncMock(return_value=mock_task_info)
+        interpret_instruction = make_async_stub(mock_task_info)
+        monkeypatch.setattr(agent.llm_service, "interpret_instruction", interpret_instruction)
         
         result = await agent._interpret_instruction("send email to test@example.com")
         
         assert result == mock_task_info
-        agent.llm_service.interpret_instruction.assert_called_once()
+        assert len(interpret_instruction.calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_batch_interprets_instructions_together(self, agent, monkeypatch):
+        """Test that a batch sends its instructions to the LLM service in one call."""
+        interpret_many = make_async_stub([None, None])
+        monkeypatch.setattr(agent.llm_service, "interpret_many", interpret_many)
+        
+        results = await agent.execute_many(["first instruction", "second instruction"])
+        
+        assert interpret_many.calls == [((["first instruction", "second instruction"], 4), {})]
+        assert [result["error"] for result in results] == ["Failed to interpret instruction"] * 2
+    
+    @pytest.mark.asyncio
+    async def test_browser_session_uses_provider_profile(self):
+        """Test that a warm session is replaced when the provider has its own browser profile."""
+        config = Config(
+            openai_api_key="test_key",
+            gmail_email="test@gmail.com",
+            gmail_password="test_password",
+            user_data_dir_gmail="browser_profiles/gmail"
+        )
+        agent = GenericUIAgent(config)
+        
+        with patch("src.core.agent.BrowserManager") as browser_manager:
+            browser_manager.return_value.start = AsyncMock()
+            browser_manager.return_value.stop = AsyncMock()
+            
+            await agent._initialize_browser()
+            await agent._ensure_browser("gmail")
+            await agent._ensure_browser("gmail")
+        
+        assert [call.args for call in browser_manager.return_value.start.await_args_list] == [(None,), ("gmail",)]
+        browser_manager.return_value.stop.assert_awaited_once()
     
     @pytest.mark.asyncio
     async def test_provider_selection(self, agent):
@@ -155,6 +207,179 @@ class TestLLMService:
         recipients = "test@example.com"
         formatted = llm_service._format_recipients(recipients)
         assert formatted == "test@example.com"
+    
+    @pytest.mark.asyncio
+    async def test_identical_prompts_are_cached(self):
+        """Test that a repeated prompt is answered from the cache."""
+        llm_service = LLMService(Config(llm_cache_enabled=True))
+        llm_service._request_llm = make_async_stub("{}")
+        
+        assert await llm_service._call_llm("prompt") == await llm_service._call_llm("prompt")
+        assert len(llm_service._request_llm.calls) == 1
+        assert llm_service.stats == {"hits": 1, "misses": 1}
+        
+        # The cache stays bounded, dropping the least recently used prompt
+        for i in range(PROMPT_CACHE_SIZE):
+            await llm_service._call_llm(f"prompt {i}")
+        assert len(llm_service._cache) == PROMPT_CACHE_SIZE
+        await llm_service._call_llm("prompt")
+        assert llm_service.stats["misses"] == PROMPT_CACHE_SIZE + 2
+    
+    @pytest.mark.asyncio
+    async def test_simple_instruction_skips_llm(self, llm_service, monkeypatch):
+        """Test that a simple email instruction is parsed without calling the LLM."""
+        call_llm_json = make_async_stub({})
+        monkeypatch.setattr(llm_service, "_call_llm_json", call_llm_json)
+        
+        result = await llm_service.interpret_instruction(
+            "send email to joe@example.com and jane@example.com with subject 'Sync' saying 'Meeting at 2pm'"
+        )
+        assert result["recipients"] == ["joe@example.com", "jane@example.com"]
+        assert result["subject"] == "Sync"
+        assert result["content"] == "Meeting at 2pm"
+        assert not call_llm_json.calls
+        
+        assert llm_service._try_fast_parse("send email to my manager saying 'hi' via outlook") is None
+        assert llm_service._try_fast_parse("send email to a@b.com: hi and also email c@d.com: yo") is None
+    
+    def test_html_is_compacted_to_interactive_elements(self):
+        """Test that page HTML is reduced to the elements the analysis can act on."""
+        page = "<body><p>" + "filler " * 5000 + "</p><input type='email' name='identifier'><button id='next'>Next</button></body>"
+        
+        compacted = _compact_html(page, max_tokens=100)
+        assert compacted == '<input name="identifier" type="email">\n<button id="next">Next</button>'
+        
+        # A repeat snapshot is answered from the cache, keyed by its digest
+        assert _compact_html(page, max_tokens=100) is compacted
+    
+    @pytest.mark.asyncio
+    async def test_action_plan_is_streamed(self, llm_service, monkeypatch):
+        """Test that each action is yielded once its JSON is complete."""
+        async def stream(prompt):
+            for chunk in ('[{"step": 1, "action": "nav', 'igate"}, {"step": 2,', ' "action": "click"}]'):
+                yield chunk
+        monkeypatch.setattr(llm_service, "_stream_llm", stream)
+        
+        actions = [action async for action in llm_service.stream_action_plan({}, {})]
+        assert [action["action"] for action in actions] == ["navigate", "click"]
+
+class TestDiskCache:
+    """Test cases for the DiskCache class."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create a cache backed by a temporary database."""
+        cache = DiskCache(str(tmp_path / "llm_cache.db"))
+        yield cache
+        cache.close()
+    
+    def test_round_trip(self, cache):
+        """Test storing and retrieving a value."""
+        key = make_cache_key(instruction="send email to test@example.com", model="gpt-4")
+        cache.set(key, {"task_type": "email"}, ttl=60)
+        assert cache.get(key) == {"task_type": "email"}
+    
+    def test_expired_entry(self, cache):
+        """Test that expired entries are not returned."""
+        cache.set("key", {"task_type": "email"}, ttl=-1)
+        assert cache.get("key") is None
+    
+    def test_key_is_order_independent(self):
+        """Test that cache keys don't depend on argument order."""
+        assert make_cache_key(a=1, b=2) == make_cache_key(b=2, a=1)
+
+class TestBrowserManager:
+    """Test cases for the BrowserManager class."""
+    
+    @pytest.fixture
+    def manager(self, config):
+        """Create a browser manager with a mock page."""
+        manager = BrowserManager(config)
+        manager.page = Mock()
+        manager.page.url = "https://mail.example.com/"
+        manager.page.click = AsyncMock()
+        
+        def locator(selector):
+            async def click(**kwargs):
+                await manager.page.click(selector, **kwargs)
+            located = Mock()
+            located.first.click = click
+            return located
+        manager.page.locator = Mock(side_effect=locator)
+        return manager
+    
+    @pytest.mark.asyncio
+    async def test_click_remembers_working_fallback(self, manager):
+        """Test that a fallback selector that worked is tried first next time."""
+        async def click(selector, **kwargs):
+            if selector == "#primary":
+                raise Exception("Element not found")
+        manager.page.click.side_effect = click
+        
+        assert await manager.click_element("#primary", ["#fallback"])
+        manager.page.click.reset_mock()
+        
+        assert await manager.click_element("#primary", ["#fallback"])
+        assert [call.args[0] for call in manager.page.click.await_args_list] == ["#fallback"]
+    
+    @pytest.mark.asyncio
+    async def test_locators_are_reused(self, manager):
+        """Test that repeated clicks on a selector build its locator once."""
+        await manager.click_element("#compose")
+        await manager.click_element("#compose")
+        assert manager.page.locator.call_count == 1
+
+class TestBrowserPool:
+    """Test cases for the BrowserPool class."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_acquire_starts_playwright_once(self):
+        """Test that browsers acquired together on a cold pool share one Playwright start."""
+        starts = []
+        
+        async def start():
+            starts.append(None)
+            await asyncio.sleep(0.01)
+            playwright = Mock()
+            playwright.chromium.launch = make_async_stub(Mock())
+            return playwright
+        
+        pool = BrowserPool(headless=True, size=2)
+        with patch("playwright.async_api.async_playwright", return_value=Mock(start=start)):
+            browsers = await asyncio.gather(pool.acquire(), pool.acquire())
+        
+        assert len(starts) == 1
+        assert all(browsers)
+
+class TestProviderAdapter:
+    """Test cases for the ProviderAdapter base class."""
+    
+    @pytest.mark.asyncio
+    async def test_run_batch_returns_results_in_order(self, config, monkeypatch):
+        """Test that a batch runs every task and reports them in input order."""
+        async def execute_task(self, task_info):
+            await asyncio.sleep(0.01 * task_info["delay"])
+            return {"success": True, "index": task_info["index"]}
+        monkeypatch.setattr(GmailAdapter, "execute_task", execute_task)
+        
+        task_infos = [{"index": i, "delay": 3 - i} for i in range(4)]
+        with patch("src.providers.base_provider.BrowserManager") as browser_manager:
+            browser_manager.return_value.start = AsyncMock()
+            browser_manager.return_value.stop = AsyncMock()
+            results = await GmailAdapter.run_batch(config, task_infos, concurrency=2)
+        
+        assert [result["index"] for result in results] == [0, 1, 2, 3]
+        browser_manager.return_value.start.assert_awaited_with("gmail")
+    
+    @pytest.mark.asyncio
+    async def test_run_batch_reports_failed_workers(self, config):
+        """Test that tasks are reported as failed when no browser session starts."""
+        with patch("src.providers.base_provider.BrowserManager") as browser_manager:
+            browser_manager.return_value.start = AsyncMock(side_effect=RuntimeError("no browser"))
+            browser_manager.return_value.stop = AsyncMock()
+            results = await asyncio.wait_for(GmailAdapter.run_batch(config, [{}] * 5, concurrency=2), 1)
+        
+        assert [result["error"] for result in results] == ["no browser"] * 5
 
 if __name__ == "__main__":
     pytest.main([__file__])